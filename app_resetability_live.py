@@ -11,6 +11,8 @@
 #  - Replay from Analysis sets state and reruns this script.
 # ==========================================================
 
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 
 # --- Page config early ---
@@ -35,6 +37,29 @@ DOMAIN_COLORS = {
     "🌍 Gravity Test": "#81c784",
 }
 
+
+# --- Warm the telemetry cache in the background (once per server process) ---
+def _preload(item):
+    path, domain = item
+    try:
+        domain.load_telemetry(path)
+    except Exception:
+        pass  # the Live tab reports load errors when the domain is opened
+
+
+@st.cache_resource(show_spinner=False)
+def preload_domain_telemetry():
+    by_file = {}
+    for domain in DOMAIN_MAP.values():
+        by_file.setdefault(domain.domain_info()["default_file"], domain)
+    pool = ThreadPoolExecutor(max_workers=len(by_file))
+    futures = [pool.submit(_preload, item) for item in by_file.items()]
+    pool.shutdown(wait=False)
+    return futures
+
+
+preload_domain_telemetry()
+
 # ==========================================================
 # Session State with Persistence
 # ==========================================================
@@ -2,12 +2,21 @@
 import serial
 import time
 import argparse
+import itertools
+import os
+import signal
+import sys
 from pathlib import Path
 
 # --- Configuration ---
 DEFAULT_OUTPUT_FILE = Path("data/telemetry.csv")
 DEFAULT_BAUD_RATE = 115200
 HEADER = "timestamp,qw,qx,qy,qz\n"
+WRITE_BUFFER_BYTES = 1 << 16
+FLUSH_INTERVAL_S = 1.0  # how stale the CSV on disk may get while logging
+READ_TIMEOUT_S = 0.01  # return quickly from read() when the UART is idle
+WRITE_BATCH_ROWS = 64
+ROW_FORMAT = "%.4f,%.6f,%.6f,%.6f,%.6f\n"
 
 def get_serial_ports():
     """Lists available serial ports on the system."""
@@ -15,6 +24,10 @@ def get_serial_ports():
     ports = serial.tools.list_ports.comports()
     return [port.device for port in ports]
 
+def format_rows(rows):
+    """Formats a batch of (timestamp, qw, qx, qy, qz) rows as CSV text in one call."""
+    return (ROW_FORMAT * len(rows)) % tuple(itertools.chain.from_iterable(rows))
+
 def start_logging(port: str, baud_rate: int, output_file: Path):
     """
     Connects to a serial port, reads quaternion data, and logs it to a CSV file.
@@ -23,30 +36,54 @@ def start_logging(port: str, baud_rate: int, output_file: Path):
     print(f"Attempting to connect to port '{port}' at {baud_rate} baud...")
     
     try:
-        with serial.Serial(port, baud_rate, timeout=2) as ser, open(output_file, 'w', newline='') as f:
+        with serial.Serial(port, baud_rate, timeout=READ_TIMEOUT_S) as ser, open(output_file, 'w', newline='', buffering=WRITE_BUFFER_BYTES) as f:
             print(f"✅ Connection successful! Logging data to '{output_file}'.")
             
             f.write(HEADER)
             f.flush()
             start_time = time.time()
+            last_flush = start_time
+            buf = bytearray()  # bytes received but not yet terminated by '\n'
+            batch = []  # parsed rows not yet handed to the file
             
-            while True:
-                line = ser.readline()
-                if not line:
-                    continue
-                try:
-                    data_str = line.decode('utf-8').strip()
-                    values = [float(v) for v in data_str.split(',')]
-                    
-                    if len(values) == 4:
-                        qw, qx, qy, qz = values
-                        timestamp = time.time() - start_time
-                        log_line = f"{timestamp:.4f},{qw:.6f},{qx:.6f},{qy:.6f},{qz:.6f}\n"
-                        f.write(log_line)
+            try:
+                while True:
+                    # Flush on a timer rather than per line, so a 100+ Hz stream
+                    # doesn't cost one write syscall per sample.
+                    now = time.time()
+                    if now - last_flush > FLUSH_INTERVAL_S:
+                        if batch:
+                            f.write(format_rows(batch))
+                            batch.clear()
                         f.flush()
-                except (UnicodeDecodeError, ValueError):
-                    # In a background process, we might not want to print every error
-                    pass # Silently ignore malformed lines
+                        last_flush = now
+
+                    # Drain everything the driver has buffered in one call
+                    # instead of readline()'s byte-at-a-time reads.
+                    chunk = ser.read(max(ser.in_waiting, 1))
+                    if not chunk:
+                        continue
+                    buf += chunk
+                    *lines, buf = buf.split(b'\n')
+                    for line in lines:
+                        try:
+                            data_str = line.decode('utf-8').strip()
+                            values = [float(v) for v in data_str.split(',')]
+                            
+                            if len(values) == 4:
+                                batch.append((time.time() - start_time, *values))
+                        except (UnicodeDecodeError, ValueError):
+                            # In a background process, we might not want to print every error
+                            pass # Silently ignore malformed lines
+                    if len(batch) >= WRITE_BATCH_ROWS:
+                        f.write(format_rows(batch))
+                        batch.clear()
+            finally:
+                # Persist whatever is still buffered before the file is closed
+                if batch:
+                    f.write(format_rows(batch))
+                f.flush()
+                os.fsync(f.fileno())
                     
     except serial.SerialException as e:
         print(f"❌ LOGGING PROCESS ERROR: Could not open serial port '{port}'. Reason: {e}")
@@ -65,6 +102,10 @@ def main():
     parser.add_argument('--list-ports', action='store_true', help="List available serial ports and exit.")
     
     args = parser.parse_args()
+
+    # The UI stops us with terminate(); turn SIGTERM into a normal exit so
+    # the buffered rows are flushed to disk on the way out.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     
     if args.list_ports:
         print("Available serial ports:")
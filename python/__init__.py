@@ -6,7 +6,6 @@
 #   from python.ui_live import render_live_tab
 # ==========================================================
 
-import os
 import sys
 from pathlib import Path
 
@@ -26,11 +25,3 @@ except Exception:
     # Soft fail so Streamlit can hot-reload even if one module is being edited
     pass
 
-
-# --- Clean import banner (optional aesthetic) ---
-def _show_import_banner():
-    if os.getenv("RESETABILITY_SILENT", "0") != "1":
-        print("🧭 Resetability Control Suite package loaded (modular UI mode).")
-
-
-_show_import_banner()
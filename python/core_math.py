@@ -5,10 +5,13 @@
 # This is the single source of truth for math, used by all other modules.
 # ==========================================================
 
+import math
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-from so3_reset import (estimate_lambda_and_R, predict_reset_benefit, quat_conj,
-                       quat_mul, quat_normalize, quat_to_axang)
+from so3_reset import (_reset_metrics_nb, njit, quat_conj, quat_conj_vec, quat_mul,
+                       quat_mul_vec, quat_to_axang_vec)
 
 
 def quat_error(q_ref, q):
@@ -16,18 +19,66 @@ def quat_error(q_ref, q):
     return quat_mul(q_ref, quat_conj(q))
 
 
+def quats_to_R(Q):
+    """Batched quaternion → rotation matrix: (N,4) → (N,3,3), in the input's float dtype."""
+    Q = np.asarray(Q)
+    Q = Q.astype(np.result_type(Q, np.float32), copy=False)
+    Q = Q / np.maximum(np.linalg.norm(Q, axis=1, keepdims=True), 1e-15)
+    w, x, y, z = Q[:, 0], Q[:, 1], Q[:, 2], Q[:, 3]
+    R = np.empty((len(Q), 3, 3), dtype=Q.dtype)
+    R[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    R[:, 0, 1] = 2 * (x * y - z * w)
+    R[:, 0, 2] = 2 * (x * z + y * w)
+    R[:, 1, 0] = 2 * (x * y + z * w)
+    R[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    R[:, 1, 2] = 2 * (y * z - x * w)
+    R[:, 2, 0] = 2 * (x * z - y * w)
+    R[:, 2, 1] = 2 * (y * z + x * w)
+    R[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+@lru_cache(maxsize=256)
+def _quat_to_R_key(wk, xk, yk, zk):
+    R = quats_to_R([[wk, xk, yk, zk]])[0]
+    R.flags.writeable = False  # shared between callers
+    return R
+
+
 def quat_to_R(qw, qx, qy, qz):
-    """Quaternion → rotation matrix (3×3)."""
+    """Quaternion → rotation matrix (3×3), memoized on the unit quaternion rounded to 1e-6.
+
+    The returned array is read-only; copy it before modifying.
+    """
     w, x, y, z = float(qw), float(qx), float(qy), float(qz)
-    n = max(np.sqrt(w * w + x * x + y * y + z * z), 1e-15)
-    w, x, y, z = w / n, x / n, y / n, z / n
-    return np.array(
-        [
-            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
-            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
-            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
-        ]
-    )
+    # Normalize before rounding, so a small-magnitude quaternion keeps its direction
+    n = max(math.sqrt(w * w + x * x + y * y + z * z), 1e-15)
+    return _quat_to_R_key(round(w / n, 6), round(x / n, 6), round(y / n, 6), round(z / n, 6))
+
+
+# No fastmath: a NaN sample must give NaN rows for the windows that include it.
+# No parallel=True: Streamlit sessions call this from several threads at once,
+# which Numba's default threading layers do not survive.
+@njit(cache=True)
+def _analyze_core(axes, thetas, quats, window):
+    """R, θ_net [deg] and predicted benefit [deg] for every window end i.
+
+    ``quats`` must already be unit-norm.
+    """
+    end = quats.shape[0] - 1
+    n_out = end - window
+    R_out = np.empty(n_out)
+    theta_out = np.empty(n_out)
+    benefit_out = np.empty(n_out)
+    for k in range(n_out):
+        i = k + window
+        R, th_net, benefit = _reset_metrics_nb(
+            axes, thetas, i - window, i, quats[i, 0], quats[i, 1], quats[i, 2], quats[i, 3]
+        )
+        R_out[k] = R
+        theta_out[k] = math.degrees(th_net)
+        benefit_out[k] = benefit
+    return R_out, theta_out, benefit_out
 
 
 def analyze_from_quats(df, window=50, fps=10):
@@ -41,42 +92,39 @@ def analyze_from_quats(df, window=50, fps=10):
         return pd.DataFrame(), pd.DataFrame()
 
     quats = df[["qw", "qx", "qy", "qz"]].to_numpy()
-    timestamps = (
-        df["timestamp"].to_numpy()
-        if "timestamp" in df.columns
-        else np.arange(len(quats)) / max(fps, 1)
-    )
+    timestamps = df["timestamp"].to_numpy() if "timestamp" in df.columns else None
+    return analyze_quat_array(quats, timestamps, window=window, fps=fps)
+
+
+def analyze_quat_array(quats, timestamps=None, window=50, fps=10):
+    """analyze_from_quats on an (N, 4) [qw, qx, qy, qz] array.
+
+    Without timestamps, samples are assumed to be 1/fps apart.
+    """
+    # Telemetry is stored as float32, but the step angles (~1e-2 rad, via arccos)
+    # and the window folds need float64 to keep R accurate near the 0.05 cut.
+    quats = np.ascontiguousarray(quats, dtype=np.float64)
+    if len(quats) == 0:
+        return pd.DataFrame(), pd.DataFrame()
+    # Normalize every sample once; the kernel then uses rows as q_current as-is
+    quats = quats / (np.linalg.norm(quats, axis=1, keepdims=True) + 1e-15)
+    if timestamps is None:
+        timestamps = np.arange(len(quats)) / max(fps, 1)
 
-    Rs, thetas, ts, benefits = [], [], [], []
     end = len(quats) - 1
     if end <= window:
         return pd.DataFrame(), pd.DataFrame()
 
-    for i in range(window, end):
-        seq = []
-        for j in range(i - window, i):
-            q1, q2 = quats[j], quats[j + 1]
-            # Corrected: dq should be relative rotation from q1 to q2
-            dq = quat_error(q2, q1)
-            n, th = quat_to_axang(dq)
-            seq.append((n, th))
-
-        lam, R, th_net = estimate_lambda_and_R(seq)
-        Rs.append(R)
-        thetas.append(np.degrees(th_net))
-        ts.append(timestamps[i])
-
-        try:
-            q_current = quat_normalize(quats[i])
-            benefit_deg, *_ = predict_reset_benefit(seq, q_current)
-        except Exception:
-            benefit_deg = np.nan
+    # Relative rotation from each sample to the next (dq = q2 * conj(q1)),
+    # computed once for all windows instead of once per (window, step) pair.
+    dq_all = quat_mul_vec(quats[1:], quat_conj_vec(quats[:-1]))
+    axes_all, theta_all = quat_to_axang_vec(dq_all)
 
-        benefits.append(benefit_deg)
+    Rs, thetas, benefits = _analyze_core(axes_all, theta_all, quats, window)
 
     results_df = pd.DataFrame(
         {
-            "timestamp": ts,
+            "timestamp": timestamps[window:end],
             "R": Rs,
             "theta_net_deg": thetas,
             "predicted_benefit_deg": benefits,
@@ -90,3 +138,17 @@ def analyze_from_quats(df, window=50, fps=10):
     ].copy()
 
     return results_df, candidates_df
+
+
+# No fastmath: the NaN test below must survive optimization.
+@njit(cache=True)
+def mean_speed(wx, wy, wz):
+    """Mean |ω| over samples, skipping rows with a NaN component (like nanmean)."""
+    s = 0.0
+    c = 0
+    for i in range(len(wx)):
+        v = wx[i] * wx[i] + wy[i] * wy[i] + wz[i] * wz[i]
+        if v == v:
+            s += math.sqrt(v)
+            c += 1
+    return s / c if c else math.nan
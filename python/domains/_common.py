@@ -0,0 +1,104 @@
+# python/domains/_common.py
+# Shared helpers for the domain modules.
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+QUAT_DTYPES = {"qw": np.float32, "qx": np.float32, "qy": np.float32, "qz": np.float32}
+
+
+# Schema metadata key of a Parquet sidecar: b"<csv size>:<csv mtime_ns>" it was parsed from
+SIDECAR_KEY = b"resetability.source_csv"
+# A CSV modified more recently than this may still be growing (live logger): no sidecar yet
+SIDECAR_MIN_AGE_S = 60.0
+
+
+def _read_quat_csv(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    # mtime_ns/size (stat'ed by the caller) stamp and validate the Parquet sidecar.
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path).astype(QUAT_DTYPES)
+    stamp = f"{size}:{mtime_ns}".encode()
+    df = _read_parquet_sibling(path, stamp)
+    if df is None:
+        df = pd.read_csv(path, dtype=QUAT_DTYPES, engine="c")
+        _write_parquet_sibling(path, df, mtime_ns, size)
+    return df
+
+
+def _parquet_sibling(path: str) -> str:
+    """data/x.parquet next to data/x.csv."""
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def _read_parquet_sibling(path: str, stamp: bytes):
+    """The Parquet sidecar of a CSV, or None unless it was written from this exact CSV version."""
+    try:
+        import pyarrow.parquet as pq
+
+        pq_path = _parquet_sibling(path)
+        if (pq.read_schema(pq_path).metadata or {}).get(SIDECAR_KEY) != stamp:
+            return None
+        return pd.read_parquet(pq_path).astype(QUAT_DTYPES)
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+def _write_parquet_sibling(path: str, df: pd.DataFrame, mtime_ns: int, size: int):
+    """Best-effort Parquet copy of a parsed CSV, so the next session skips the parse.
+
+    The copy is stamped with the CSV size and mtime it was parsed from. Skipped
+    while the CSV is still being appended to (recently modified, changed since
+    it was stat'ed, or ending mid-row); written under a temporary name and
+    renamed so a concurrent reader never sees a partial file.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        stat = os.stat(path)
+        if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+            return
+        if time.time() - stat.st_mtime < SIDECAR_MIN_AGE_S:
+            return
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                return
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), SIDECAR_KEY: f"{size}:{mtime_ns}".encode()}
+        )
+        pq_path = _parquet_sibling(path)
+        tmp = pq_path + ".tmp"
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, pq_path)
+    except (OSError, ImportError, ValueError):
+        pass
+
+
+def load_quat_csv(path) -> pd.DataFrame:
+    """Read a quaternion telemetry CSV.
+
+    A Parquet sidecar with the same stem (written on an earlier parse) is read
+    instead when it was made from this exact CSV size and mtime. Accepts a
+    filesystem path or a file-like object (e.g. a Streamlit upload). Results
+    are not cached here: ui_helpers.load_domain_telemetry caches the loaded
+    frame per file version.
+    """
+    if isinstance(path, (str, os.PathLike)):
+        path = os.fspath(path)
+        stat = os.stat(path)
+        return _read_quat_csv(path, stat.st_mtime_ns, stat.st_size)
+    return pd.read_csv(path, dtype=QUAT_DTYPES, engine="c")
+
+
+SUMMARY_COLUMNS = ("R", "theta_net_deg", "predicted_benefit_deg")
+
+
+def base_summary(results_df: pd.DataFrame):
+    """(mean R, mean θ_net [deg], mean benefit [deg]) in one aggregation."""
+    means = results_df.agg({col: "mean" for col in SUMMARY_COLUMNS})
+    return tuple(float(means[col]) for col in SUMMARY_COLUMNS)
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from ._common import base_summary, load_quat_csv
+
 
 def domain_info():
     return {
@@ -13,7 +15,7 @@ def domain_info():
 def load_telemetry(path: str) -> pd.DataFrame:
     """Load spacecraft telemetry."""
     try:
-        df = pd.read_csv(path)
+        df = load_quat_csv(path)
     except Exception as e:
         raise RuntimeError(f"Failed to load spacecraft telemetry: {e}")
 
@@ -29,9 +31,7 @@ def summarize_domain(results_df: pd.DataFrame) -> dict:
     if results_df.empty:
         return {"note": "No data available"}
 
-    R_mean = float(results_df["R"].mean())
-    theta_mean = float(results_df["theta_net_deg"].mean())
-    benefit_mean = float(results_df["predicted_benefit_deg"].mean())
+    R_mean, theta_mean, benefit_mean = base_summary(results_df)
 
     stability = (
         "🛰️ Stable attitude" if R_mean < 0.2 else "⚠️ Possible control instability"
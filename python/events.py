@@ -1,36 +1,138 @@
 # python/events.py
+import atexit
 import csv
+import functools
+import queue
+import threading
 import time
 from pathlib import Path
 
+FLUSH_EVERY_ROWS = 32
+FLUSH_INTERVAL_S = 1.0
 
-class EventLogger:
-    def __init__(self, path="results/reset_events.csv"):
-        self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            with open(self.path, "w", newline="") as f:
-                csv.writer(f).writerow(
-                    [
-                        "wall_time",
-                        "timestamp",
-                        "domain",
-                        "R",
-                        "theta_net_deg",
-                        "predicted_benefit_deg",
-                    ]
-                )
 
-    def log(self, ts, domain, R, theta_deg, benefit_deg):
-        with open(self.path, "a", newline="") as f:
+_FLUSH = object()
+_CLOSE = object()
+
+
+def _open_log(path):
+    """Append handle on the event CSV, writing the header to a new file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        with open(path, "w", newline="") as f:
             csv.writer(f).writerow(
                 [
-                    int(time.time()),
-                    float(ts),
-                    domain,
-                    float(R),
-                    float(theta_deg),
-                    float(benefit_deg),
+                    "wall_time",
+                    "timestamp",
+                    "domain",
+                    "R",
+                    "theta_net_deg",
+                    "predicted_benefit_deg",
                 ]
             )
+    return open(path, "a", newline="", buffering=1 << 15)
+
+
+def _drain(q, path, failed):
+    """Writer thread: append queued rows, flushing by count/age or on request.
+
+    An error (creating results/, permissions, full disk, ...) ends the thread;
+    it is appended to ``failed`` for the logger to re-raise.
+    """
+    f = None
+    try:
+        f = _open_log(path)
+        w = csv.writer(f)
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, FLUSH_INTERVAL_S - (time.monotonic() - last_flush)) if pending else None
+            try:
+                item = q.get(timeout=timeout)
+            except queue.Empty:
+                item = _FLUSH
+            if item is _CLOSE:
+                break
+            if item is not _FLUSH:
+                w.writerow(item)
+                pending += 1
+                if pending < FLUSH_EVERY_ROWS and time.monotonic() - last_flush <= FLUSH_INTERVAL_S:
+                    continue
+            f.flush()
+            pending = 0
+            last_flush = time.monotonic()
+    except Exception as e:
+        failed.append(e)
+    finally:
+        try:
+            if f is not None:
+                f.close()
+        except Exception as e:
+            failed.append(e)
+
+
+def _shutdown(q, writer):
+    """At interpreter exit: write out what is still queued before the daemon writer is killed."""
+    if writer.is_alive():
+        q.put(_CLOSE)
+        writer.join()
+
+
+class EventLogger:
+    """Appends reset events to a CSV from a background writer thread.
+
+    Creating the file (and its header) happens on the writer thread too, so
+    neither construction nor log() touches the disk. log() only queues the
+    row; the writer keeps one buffered handle open and flushes every
+    FLUSH_EVERY_ROWS events or FLUSH_INTERVAL_S seconds, whichever comes
+    first, and when flush() or close() is called. A writer error is raised
+    again from the next log(), flush() or close(); rows still queued at
+    interpreter exit are written out by an atexit hook.
+    """
+
+    def __init__(self, path="results/reset_events.csv"):
+        self.path = Path(path)
+        self._q = queue.SimpleQueue()
+        self._failed = []
+        # The thread and the exit hook get the queue and path, not self, so an
+        # unreferenced logger is still collected and __del__ can stop it.
+        self._writer = threading.Thread(
+            target=_drain, args=(self._q, self.path, self._failed), name="EventLogger", daemon=True
+        )
+        self._writer.start()
+        self._at_exit = functools.partial(_shutdown, self._q, self._writer)
+        atexit.register(self._at_exit)
+
+    def _raise_writer_error(self):
+        if self._failed:
+            raise self._failed[0]
+
+    def log(self, ts, domain, R, theta_deg, benefit_deg):
+        self._raise_writer_error()
+        self._q.put(
+            [
+                int(time.time()),
+                float(ts),
+                domain,
+                float(R),
+                float(theta_deg),
+                float(benefit_deg),
+            ]
+        )
         return self.path
+
+    def flush(self):
+        """Ask the writer to flush; does not wait for the write to land."""
+        self._raise_writer_error()
+        self._q.put(_FLUSH)
+
+    def close(self):
+        """Write out everything queued so far and stop the writer."""
+        _shutdown(self._q, self._writer)
+        atexit.unregister(self._at_exit)
+        self._raise_writer_error()
+
+    def __del__(self):
+        q = getattr(self, "_q", None)
+        if q is not None:
+            q.put(_CLOSE)
@@ -8,6 +8,7 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
+from so3_reset import njit
 
 # --- Parameters ---
 N = 1000           # number of samples
@@ -21,30 +22,33 @@ wy = 0.15 * np.cos(0.4 * T) + 0.03 * np.random.randn(N)
 wz = 0.25 * np.sin(0.2 * T + 0.5) + 0.03 * np.random.randn(N)
 
 # --- Integrate to quaternions ---
-def quat_mul(q1, q2):
-    w1, x1, y1, z1 = q1
-    w2, x2, y2, z2 = q2
-    return np.array([
-        w1*w2 - x1*x2 - y1*y2 - z1*z2,
-        w1*x2 + x1*w2 + y1*z2 - z1*y2,
-        w1*y2 - x1*z2 + y1*w2 + z1*x2,
-        w1*z2 + x1*y2 - y1*x2 + z1*w2
-    ])
+@njit(cache=True)
+def _fold_quats(dq):
+    """Sequential product q[i] = dq[i] * q[i-1], renormalized each step."""
+    q = np.zeros_like(dq)
+    q[0, 0] = 1.0  # identity
+    for i in range(1, len(dq)):
+        w1, x1, y1, z1 = dq[i, 0], dq[i, 1], dq[i, 2], dq[i, 3]
+        w2, x2, y2, z2 = q[i-1, 0], q[i-1, 1], q[i-1, 2], q[i-1, 3]
+        w = w1*w2 - x1*x2 - y1*y2 - z1*z2
+        x = w1*x2 + x1*w2 + y1*z2 - z1*y2
+        y = w1*y2 - x1*z2 + y1*w2 + z1*x2
+        z = w1*z2 + x1*y2 - y1*x2 + z1*w2
+        n = np.sqrt(w*w + x*x + y*y + z*z)
+        q[i, 0], q[i, 1], q[i, 2], q[i, 3] = w/n, x/n, y/n, z/n
+    return q
 
 def integrate_quats(wx, wy, wz, dt):
-    q = np.zeros((len(wx), 4))
-    q[0] = [1, 0, 0, 0]  # identity
-    for i in range(1, len(wx)):
-        omega = np.array([wx[i], wy[i], wz[i]])
-        theta = np.linalg.norm(omega) * dt
-        if theta > 0:
-            axis = omega / theta
-            dq = np.hstack([np.cos(theta/2), np.sin(theta/2)*axis])
-        else:
-            dq = np.array([1, 0, 0, 0])
-        q[i] = quat_mul(dq, q[i-1])
-        q[i] /= np.linalg.norm(q[i])
-    return q
+    omega = np.stack([wx, wy, wz], axis=1)
+    theta = np.linalg.norm(omega, axis=1) * dt
+    # Per-step rotations, built for all samples at once
+    dq = np.zeros((len(wx), 4))
+    dq[:, 0] = 1.0
+    moving = theta > 0
+    axis = omega[moving] / theta[moving, None]
+    dq[moving, 0] = np.cos(theta[moving]/2)
+    dq[moving, 1:] = np.sin(theta[moving]/2)[:, None] * axis
+    return _fold_quats(dq)
 
 q = integrate_quats(wx, wy, wz, DT)
 
@@ -64,6 +68,7 @@ df = pd.DataFrame({
 out_path = Path("data/telemetry.csv")
 out_path.parent.mkdir(parents=True, exist_ok=True)
 df.to_csv(out_path, index=False)
+# The app writes its own stamped Parquet sidecar the first time it parses this CSV
 
 print(f"\n✅ Telemetry data generated successfully!")
 print(f"Saved to: {out_path.resolve()}")
@@ -0,0 +1,59 @@
+# ==========================================================
+# lttb.py
+# ----------------------------------------------------------
+# Largest-Triangle-Three-Buckets downsampling, used to cut
+# plotted series down to roughly screen resolution.
+# ==========================================================
+
+import numpy as np
+from so3_reset import NUMBA_AVAILABLE, njit
+
+
+@njit(cache=True)
+def lttb_indices(x, y, n_out):
+    """Indices of the n_out points LTTB keeps from (x, y); first and last always kept.
+
+    NaN samples never win a bucket unless the whole bucket is NaN.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket is the third triangle vertex
+        lo = int((i + 1) * every) + 1
+        hi = min(int((i + 2) * every) + 1, n)
+        sx = 0.0
+        sy = 0.0
+        cnt = 0
+        for j in range(lo, hi):
+            if y[j] == y[j]:
+                sx += x[j]
+                sy += y[j]
+                cnt += 1
+        avg_x = sx / cnt if cnt > 0 else np.nan
+        avg_y = sy / cnt if cnt > 0 else np.nan
+
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        best = lo
+        max_area = -1.0
+        for j in range(lo, hi):
+            area = abs(
+                (x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])
+            )
+            if area > max_area:
+                max_area = area
+                best = j
+        out[i + 1] = best
+        a = best
+    return out
+
+
+if NUMBA_AVAILABLE:
+    # Compile (or load from the on-disk cache) now rather than on first use
+    lttb_indices(np.arange(4.0), np.arange(4.0), 3)
@@ -7,21 +7,39 @@ the SO(3) resetability metrics across noise levels and random seeds.
 
 import numpy as np
 import pandas as pd
-from tqdm import tqdm
 
-from .so3_reset import (axang_to_quat, estimate_lambda_and_R,
-                        predict_reset_benefit, quat_normalize)
+from .so3_reset import (NUMBA_AVAILABLE, _reset_metrics_nb, axang_to_quat, njit,
+                        predict_reset_benefit_batch)
 
 
-def random_rotation_seq(n_steps=100, step_mean=0.02, step_std=0.01):
-    """Generate a random sequence of small axis-angle increments."""
-    seq = []
-    for _ in range(n_steps):
-        axis = np.random.randn(3)
-        axis /= np.linalg.norm(axis) + 1e-12
-        theta = abs(np.random.normal(step_mean, step_std))
-        seq.append((axis, theta))
-    return seq
+def random_rotation_batch(rng, n_runs=500, n_steps=100, step_mean=0.02, step_std=0.01):
+    """Generate n_runs random sequences of small axis-angle increments.
+
+    ``rng`` is a ``np.random.Generator``; all draws are made in bulk, as
+    float32 (half the memory of float64; the kernels accumulate in float64).
+    Returns SoA arrays: unit axes (n_runs, n_steps, 3), angles (n_runs, n_steps).
+    """
+    axes = rng.standard_normal((n_runs, n_steps, 3), dtype=np.float32)
+    axes /= np.linalg.norm(axes, axis=-1, keepdims=True) + 1e-12
+    thetas = rng.standard_normal((n_runs, n_steps), dtype=np.float32)
+    thetas *= step_std
+    thetas += step_mean
+    np.abs(thetas, out=thetas)
+    return axes, thetas
+
+
+# No fastmath, like the so3_reset kernels it calls: NaN must stay NaN.
+# No parallel=True: it runs on Streamlit script threads, like core_math._analyze_core.
+@njit(cache=True)
+def _montecarlo_kernel(axes, thetas, q_current, R, theta_deg, benefit_deg):
+    """Fill per-run R, θ_net [deg], benefit [deg]."""
+    n_runs, n_steps = thetas.shape
+    cw, cx, cy, cz = q_current[0], q_current[1], q_current[2], q_current[3]
+    for r in range(n_runs):
+        R[r], th_net, benefit_deg[r] = _reset_metrics_nb(
+            axes[r], thetas[r], 0, n_steps, cw, cx, cy, cz
+        )
+        theta_deg[r] = np.degrees(th_net)
 
 
 def run_montecarlo(
@@ -49,29 +67,44 @@ def run_montecarlo(
     DataFrame
         Columns: ['R', 'theta_net_deg', 'predicted_benefit_deg']
     """
-    np.random.seed(seed)
-    results = []
-
-    for _ in tqdm(range(n_runs), desc="Monte Carlo robot runs"):
-        seq = random_rotation_seq(n_steps, step_mean=0.02, step_std=noise_sigma)
-        q_current = axang_to_quat([0, 0, 1], 0.05)  # nominal orientation
-        try:
-            lam, R, th_net = estimate_lambda_and_R(seq)
-            benefit_deg, *_ = predict_reset_benefit(seq, q_current)
-            results.append((R, np.degrees(th_net), benefit_deg))
-        except Exception:
-            results.append((np.nan, np.nan, np.nan))
-
-    df = pd.DataFrame(results, columns=["R", "theta_net_deg", "predicted_benefit_deg"])
+    rng = np.random.default_rng(seed)
+    axes, thetas = random_rotation_batch(
+        rng, n_runs, n_steps, step_mean=0.02, step_std=noise_sigma
+    )
+    q_current = axang_to_quat([0, 0, 1], 0.05)  # nominal orientation
+
+    # Output columns are allocated once; runs that fail to evaluate stay NaN
+    R = np.full(n_runs, np.nan)
+    theta_deg = np.full(n_runs, np.nan)
+    benefit_deg = np.full(n_runs, np.nan)
+    if NUMBA_AVAILABLE:
+        _montecarlo_kernel(axes, thetas, q_current, R, theta_deg, benefit_deg)
+    else:
+        # All runs are composed in lockstep, one vectorized step at a time
+        benefit_deg[:], _, _, _, R[:], th_net = predict_reset_benefit_batch(
+            axes, thetas, q_current
+        )
+        np.degrees(th_net, out=theta_deg)
+
+    df = pd.DataFrame(
+        {"R": R, "theta_net_deg": theta_deg, "predicted_benefit_deg": benefit_deg},
+        copy=False,
+    )
     return df
 
 
 def summarize_results(df: pd.DataFrame):
-    """Compute summary statistics of Monte Carlo output."""
+    """Compute summary statistics of Monte Carlo output.
+
+    The three column means come from one nanmean over the (n_runs, 3) array.
+    """
+    vals = df[["R", "theta_net_deg", "predicted_benefit_deg"]].to_numpy(dtype=np.float64)
+    mean_R, mean_theta, mean_benefit = np.nanmean(vals, axis=0)
+    R = vals[:, 0]
     return {
-        "mean_R": np.nanmean(df["R"]),
-        "std_R": np.nanstd(df["R"]),
-        "mean_theta_deg": np.nanmean(df["theta_net_deg"]),
-        "mean_benefit_deg": np.nanmean(df["predicted_benefit_deg"]),
-        "reset_opportunities": int((df["R"] < 0.05).sum()),
+        "mean_R": mean_R,
+        "std_R": np.nanstd(R),
+        "mean_theta_deg": mean_theta,
+        "mean_benefit_deg": mean_benefit,
+        "reset_opportunities": int((R < 0.05).sum()),
     }
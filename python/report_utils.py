@@ -1,19 +1,76 @@
 # python/report_utils.py (Final, Verified Version)
+# reportlab and matplotlib are imported on first use: the UI modules import this
+# file on every page load, but only a report request needs either library.
+import hashlib
 import pandas as pd
 import numpy as np
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import matplotlib.pyplot as plt
+from collections import OrderedDict
 from io import BytesIO
+from pathlib import Path
 from datetime import datetime
+from threading import Lock
+
+REPORT_COLUMNS = ['R', 'theta_net_deg', 'predicted_benefit_deg', 'timestamp']
+REPORT_TABLE_COLUMNS = ['timestamp', 'R', 'theta_net_deg', 'predicted_benefit_deg']
+MAX_ANNOTATIONS = 30
+
+def _report_columns(df):
+    """REPORT_COLUMNS present in df; Monte Carlo frames have no timestamp."""
+    return [c for c in REPORT_COLUMNS if c in df.columns]
+
+def _finite_rows(df):
+    """Rows whose report columns are all finite (no NaN/±inf), in one mask and one slice."""
+    mask = np.isfinite(df[_report_columns(df)].to_numpy(dtype=float)).all(axis=1)
+    return df[mask]
+
+def _top_by_benefit(df, k=10):
+    """The k rows with the largest predicted benefit, best first, in O(N)."""
+    benefit = df["predicted_benefit_deg"].to_numpy()
+    idx = np.argpartition(-benefit, k)[:k] if len(benefit) > k else np.arange(len(benefit))
+    return df.iloc[idx[np.argsort(-benefit[idx], kind="stable")]]
+
+# One Agg-backed figure, cleared and redrawn for every report (no pyplot state).
+# 100 dpi is plenty for a plot embedded at 7x2.5 in.
+_FIG = _CANVAS = None
+_FIG_LOCK = Lock()  # Streamlit sessions run in separate threads
+
+def _figure_canvas():
+    """The shared report Figure and its Agg canvas; call with _FIG_LOCK held."""
+    global _FIG, _CANVAS
+    if _FIG is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        _FIG = Figure(figsize=(7, 2.5), dpi=100)
+        _CANVAS = FigureCanvasAgg(_FIG)
+    return _FIG, _CANVAS
+
+# JPEG bytes of recent plots, so regenerating a report for unchanged data skips matplotlib
+_PLOT_CACHE = OrderedDict()
+_PLOT_CACHE_SIZE = 8
+
+def _plot_key(df_clean, is_dense_timeline):
+    # Digest of the ordered per-row hashes: the same rows in another order give another key
+    row_hashes = pd.util.hash_pandas_object(df_clean[_report_columns(df_clean)], index=False)
+    digest = hashlib.blake2b(row_hashes.to_numpy().tobytes(), digest_size=16).digest()
+    return is_dense_timeline, len(df_clean), digest
 
 def _create_report_plot(df_clean, is_dense_timeline):
     if df_clean.empty: return None
-    fig, ax1 = plt.subplots(figsize=(7, 2.5), dpi=150)
-    
+    key = _plot_key(df_clean, is_dense_timeline)
+    with _FIG_LOCK:
+        img = _PLOT_CACHE.get(key)
+        if img is None:
+            fig, canvas = _figure_canvas()
+            fig.clear()
+            _draw_report_plot(fig, fig.add_subplot(), df_clean, is_dense_timeline)
+            # JPEG encodes faster than PNG and reportlab embeds it as-is (no re-encode)
+            buf = BytesIO(); canvas.print_jpg(buf, pil_kwargs={"quality": 85, "optimize": False}); img = buf.getvalue()
+            _PLOT_CACHE[key] = img
+            if len(_PLOT_CACHE) > _PLOT_CACHE_SIZE: _PLOT_CACHE.popitem(last=False)
+        else: _PLOT_CACHE.move_to_end(key)
+    return BytesIO(img)
+
+def _draw_report_plot(fig, ax1, df_clean, is_dense_timeline):
     if is_dense_timeline:
         ax1.plot(df_clean["timestamp"], df_clean["R"], color="#4A90E2", alpha=0.7, label="R")
         ax1.set_xlabel("Time [s]"); ax1.set_ylabel("R", color="#4A90E2")
@@ -28,69 +85,130 @@ def _create_report_plot(df_clean, is_dense_timeline):
             min_theta, max_theta = df_clean["theta_net_deg"].min(), df_clean["theta_net_deg"].max()
             r_pad = (max_r - min_r) * 0.2 + 1e-5; theta_pad = (max_theta - min_theta) * 0.2 + 1e-5
             ax1.set_ylim(min_r - r_pad, max_r + r_pad); ax1.set_xlim(min_theta - theta_pad, max_theta + theta_pad)
-        ax1.scatter(df_clean["theta_net_deg"], df_clean["R"], color="#D0021B", s=40, zorder=5, label="Reset Opportunity")
+        # labels only stay legible for a few points
+        annotate = len(df_clean) <= MAX_ANNOTATIONS and "timestamp" in df_clean.columns
+        label = "Reset Opportunity" if annotate else f"{len(df_clean)} Reset Opportunities"
+        ax1.scatter(df_clean["theta_net_deg"], df_clean["R"], color="#D0021B", s=40, zorder=5, label=label)
         ax1.set_xlabel("θ_net [deg]"); ax1.set_ylabel("R", color="#4A90E2")
         ax1.grid(True, linestyle='--', alpha=0.6)
-        for i, row in df_clean.iterrows():
-            ax1.annotate(f"t={row['timestamp']:.1f}s", (row['theta_net_deg'], row['R']), textcoords="offset points", xytext=(0,10), ha='center', fontsize=7)
+        if annotate:
+            y_lo, y_hi = ax1.get_ylim(); y_off = 0.04 * (y_hi - y_lo)
+            for t, x, y in zip(df_clean["timestamp"].to_numpy(), df_clean["theta_net_deg"].to_numpy(), df_clean["R"].to_numpy()):
+                ax1.text(x, y + y_off, f"t={t:.1f}s", ha='center', va='bottom', fontsize=7)
 
     ax1.set_title("Resetability Analysis Summary"); ax1.legend(loc="upper right", fontsize=8)
     fig.tight_layout()
-    buf = BytesIO(); fig.savefig(buf, format='png'); buf.seek(0); plt.close(fig)
-    return buf
+
+# Built once per process on first use; flowables themselves are made per report
+# because platypus stores layout state on them during build().
+_STYLES = _EVENT_TABLE_STYLE = None
+
+def _report_styles():
+    global _STYLES, _EVENT_TABLE_STYLE
+    if _STYLES is None:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import TableStyle
+        _EVENT_TABLE_STYLE = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.darkslategray), ('TEXTCOLOR',(0,0),(-1,0),colors.whitesmoke),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'), ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('BOTTOMPADDING', (0,0), (-1,0), 10),
+            ('BACKGROUND', (0,1), (-1,-1), colors.ghostwhite), ('GRID', (0,0), (-1,-1), 1, colors.black)
+        ])
+        _STYLES = getSampleStyleSheet()
+    return _STYLES, _EVENT_TABLE_STYLE
+
+_EMPTY_PDF_BYTES = None
+
+def _empty_pdf_bytes():
+    """The 'no data' report, built once. It carries no generation time since it never changes."""
+    global _EMPTY_PDF_BYTES
+    if _EMPTY_PDF_BYTES is None:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        styles, _ = _report_styles()
+        story = [
+            Paragraph("SO(3) Resetability Analysis Report", styles['h1']), Spacer(1, 0.25 * inch),
+            Paragraph("Overall Summary", styles['h2']), Paragraph("No valid data to summarize.", styles['BodyText']), Spacer(1, 0.25 * inch),
+            Paragraph("Visual Summary", styles['h2']), Paragraph("No data to plot.", styles['BodyText']), Spacer(1, 0.25 * inch),
+            Paragraph("Detailed Event Log (Top 10 by Benefit)", styles['h2']), Paragraph("No discrete events to tabulate.", styles['BodyText']),
+        ]
+        buf = BytesIO(); SimpleDocTemplate(buf, pagesize=letter).build(story)
+        _EMPTY_PDF_BYTES = buf.getvalue()
+    return _EMPTY_PDF_BYTES
 
 def export_pdf(results_df, candidates_df, outfile="results/telemetry_report.pdf"):
-    doc = SimpleDocTemplate(outfile, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
+    Path(outfile).write_bytes(export_pdf_bytes(results_df, candidates_df))
+    return outfile
+
+def export_pdf_bytes(results_df, candidates_df):
+    """The report as PDF bytes, for callers that serve or cache it without a file.
 
-    story.append(Paragraph("SO(3) Resetability Analysis Report", styles['h1']))
-    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 0.25 * inch))
+    Frames without a timestamp column (Monte Carlo runs) get the θ_net/R
+    scatter and an event table keyed by row index instead of time.
+    """
+    if results_df.empty and candidates_df.empty:
+        return _empty_pdf_bytes()
 
-    is_dense_timeline = len(results_df) > 50
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+    styles, event_table_style = _report_styles()
+
+    is_dense_timeline = len(results_df) > 50 and "timestamp" in results_df.columns
     df_to_process = candidates_df if not is_dense_timeline else results_df
-    df_clean = df_to_process.replace([np.inf, -np.inf], np.nan).dropna(
-        subset=['R', 'theta_net_deg', 'predicted_benefit_deg', 'timestamp']
-    )
+    df_clean = _finite_rows(df_to_process)
 
-    story.append(Paragraph("Overall Summary", styles['h2']))
     if not df_clean.empty:
+        # df_clean is all-finite, so a plain column-wise mean needs no NaN pass
+        mean_r, mean_theta, mean_benefit = df_clean[["R", "theta_net_deg", "predicted_benefit_deg"]].to_numpy(dtype=float).mean(axis=0)
         summary_data = {
-            "Mean R": np.nanmean(df_clean["R"]), "Mean Theta [deg]": np.nanmean(df_clean["theta_net_deg"]),
-            "Mean Benefit [deg]": np.nanmean(df_clean["predicted_benefit_deg"]), "Reset Opportunities Found": len(df_clean),
+            "Mean R": mean_r, "Mean Theta [deg]": mean_theta,
+            "Mean Benefit [deg]": mean_benefit, "Reset Opportunities Found": len(df_clean),
         }
-        for key, value in summary_data.items():
-            text = f"<b>{key}:</b> {value:.4f}" if isinstance(value, float) else f"<b>{key}:</b> {value}"
-            story.append(Paragraph(text, styles['BodyText']))
-    else: story.append(Paragraph("No valid data to summarize.", styles['BodyText']))
-    story.append(Spacer(1, 0.25 * inch))
+        # One flowable for the whole block instead of one Paragraph per row
+        lines = [f"<b>{key}:</b> {value:.4f}" if isinstance(value, float) else f"<b>{key}:</b> {value}"
+                 for key, value in summary_data.items()]
+        summary = Paragraph("<br/>".join(lines), styles['BodyText'])
+    else: summary = Paragraph("No valid data to summarize.", styles['BodyText'])
 
-    story.append(Paragraph("Visual Summary", styles['h2']))
     plot_buf = _create_report_plot(df_clean, is_dense_timeline)
-    if plot_buf:
-        # --- THIS IS THE FIX ---
-        # Use the Image class, which correctly handles in-memory buffers.
-        img = Image(plot_buf, width=7*inch, height=2.5*inch)
-        story.append(img)
-    else: story.append(Paragraph("No data to plot.", styles['BodyText']))
-    story.append(Spacer(1, 0.25 * inch))
-
-    story.append(Paragraph("Detailed Event Log (Top 10 by Benefit)", styles['h2']))
+    # Image reads the in-memory JPEG buffer directly.
+    plot = Image(plot_buf, width=7*inch, height=2.5*inch) if plot_buf else Paragraph("No data to plot.", styles['BodyText'])
+
     if not df_clean.empty and not is_dense_timeline:
-        top_events = df_clean.sort_values(by='predicted_benefit_deg', ascending=False).head(10)
-        table_data = [["Timestamp (s)", "R", "Theta (deg)", "Benefit (deg)"]]
-        for _, row in top_events.iterrows():
-            table_data.append([f"{row['timestamp']:.2f}", f"{row['R']:.4f}", f"{row['theta_net_deg']:.2f}", f"{row['predicted_benefit_deg']:.2f}"])
-        t = Table(table_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.darkslategray), ('TEXTCOLOR',(0,0),(-1,0),colors.whitesmoke),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'), ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('BOTTOMPADDING', (0,0), (-1,0), 10),
-            ('BACKGROUND', (0,1), (-1,-1), colors.ghostwhite), ('GRID', (0,0), (-1,-1), 1, colors.black)
-        ]))
-        story.append(t)
-    else: story.append(Paragraph("No discrete events to tabulate.", styles['BodyText']))
+        top_events = _top_by_benefit(df_clean, 10)
+        if "timestamp" in top_events.columns:
+            table_data = [["Timestamp (s)", "R", "Theta (deg)", "Benefit (deg)"]]
+            keys = [f"{t:.2f}" for t in top_events["timestamp"].to_numpy()]
+        else:
+            table_data = [["Run", "R", "Theta (deg)", "Benefit (deg)"]]
+            keys = [str(i) for i in top_events.index]
+        table_data += [[k, f"{r:.4f}", f"{th:.2f}", f"{b:.2f}"]
+                       for k, r, th, b in zip(keys, *(top_events[c].to_numpy() for c in REPORT_TABLE_COLUMNS[1:]))]
+        table = Table(table_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+        table.setStyle(event_table_style)
+    else: table = Paragraph("No discrete events to tabulate.", styles['BodyText'])
+
+    story = [
+        Paragraph("SO(3) Resetability Analysis Report", styles['h1']),
+        Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']),
+        Spacer(1, 0.25 * inch),
+        Paragraph("Overall Summary", styles['h2']), summary, Spacer(1, 0.25 * inch),
+        Paragraph("Visual Summary", styles['h2']), plot, Spacer(1, 0.25 * inch),
+        Paragraph("Detailed Event Log (Top 10 by Benefit)", styles['h2']), table,
+    ]
+
+    pdf_buf = BytesIO()
+    SimpleDocTemplate(pdf_buf, pagesize=letter).build(story)
+    return pdf_buf.getvalue()
+
+def export_pdfs_batch(jobs):
+    """Build several reports one after another.
 
-    doc.build(story)
-    return outfile
\ No newline at end of file
+    jobs: iterable of (results_df, candidates_df, outfile). Returns the output paths in order.
+    Each report takes well under a second, so worker processes (which re-import the
+    package) or threads (serialized on _FIG_LOCK and the GIL) only add overhead.
+    """
+    return [export_pdf(results_df, candidates_df, outfile) for results_df, candidates_df, outfile in jobs]
\ No newline at end of file
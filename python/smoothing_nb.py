@@ -0,0 +1,129 @@
+# ==========================================================
+# smoothing_nb.py
+# ----------------------------------------------------------
+# Numba kernels for the plot smoothing filters (rolling mean
+# and EWMA), matching pandas' rolling(min_periods=1).mean()
+# and ewm(alpha=...).mean() including NaN handling.
+# ==========================================================
+
+import numpy as np
+from so3_reset import NUMBA_AVAILABLE, njit
+
+# Plot smoothing modes, as offered in the Live tab
+ROLLING_MEAN = "Rolling Mean"
+EWMA = "Exponential Filter (EWMA)"
+SMOOTH_MODES = ("None", ROLLING_MEAN, EWMA)
+
+# No fastmath here: it lets LLVM assume no NaNs, and the NaN checks matter.
+# No parallel=True either: three columns never pay for the thread pool, and
+# these run on Streamlit's concurrent script threads.
+
+
+@njit(cache=True)
+def rolling_mean(x, w, start=0):
+    """rolling(w, min_periods=1).mean() of x, for positions start: only."""
+    n = len(x)
+    out = np.empty(n - start)
+    lo = max(0, start - w + 1)
+    s = 0.0
+    cnt = 0
+    for i in range(lo, n):
+        v = x[i]
+        if v == v:
+            s += v
+            cnt += 1
+        if i - w >= lo:
+            old = x[i - w]
+            if old == old:
+                s -= old
+                cnt -= 1
+        if i >= start:
+            out[i - start] = s / cnt if cnt > 0 else np.nan
+    return out
+
+
+@njit(cache=True)
+def ewma_extend(x, alpha, num, den, y):
+    """Continue ewm(alpha=alpha).mean() (adjust=True) from state (num, den, y)."""
+    decay = 1.0 - alpha
+    out = np.empty(len(x))
+    for i in range(len(x)):
+        v = x[i]
+        num *= decay
+        den *= decay
+        if v == v:
+            num += v
+            den += 1.0
+            y = num / den
+        out[i] = y
+    return out, num, den, y
+
+
+@njit(cache=True)
+def rolling_mean_2d(x, w, start=0):
+    """rolling_mean on every column of an (N, k) array."""
+    out = np.empty((x.shape[0] - start, x.shape[1]))
+    for j in range(x.shape[1]):
+        out[:, j] = rolling_mean(x[:, j], w, start)
+    return out
+
+
+@njit(cache=True)
+def ewma_extend_2d(x, alpha, state):
+    """ewma_extend on every column of an (N, k) array.
+
+    state is a (k, 3) array of per-column (num, den, y); a new one is returned.
+    """
+    out = np.empty(x.shape)
+    new_state = np.empty_like(state)
+    for j in range(x.shape[1]):
+        col, num, den, y = ewma_extend(
+            x[:, j], alpha, state[j, 0], state[j, 1], state[j, 2]
+        )
+        out[:, j] = col
+        new_state[j, 0] = num
+        new_state[j, 1] = den
+        new_state[j, 2] = y
+    return out, new_state
+
+
+def ewma_state(k):
+    """Initial ewma_extend_2d state for k columns (no samples seen yet)."""
+    state = np.zeros((k, 3))
+    state[:, 2] = np.nan
+    return state
+
+
+def smooth_series(x, mode, strength, start=0, state=None):
+    """Apply plot smoothing `mode` to rows start: of x (1-D or (N, k)).
+
+    Returns (smoothed, state). For EWMA, pass the returned state back with a
+    later start to continue over appended rows; other modes ignore it.
+    "None" (or any unknown mode) returns the rows unchanged.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    X = x.reshape(len(x), -1)
+    if mode == ROLLING_MEAN:
+        out = rolling_mean_2d(X, strength, start)
+    elif mode == EWMA:
+        if state is None:
+            state = ewma_state(X.shape[1])
+        out, state = ewma_extend_2d(X[start:], 2 / (strength + 1), state)
+    else:
+        out = X[start:]
+    return (out[:, 0] if x.ndim == 1 else out), state
+
+
+def ewma(x, alpha):
+    """ewm(alpha=alpha).mean() of a whole series."""
+    return ewma_extend(np.asarray(x, dtype=np.float64), alpha, 0.0, 0.0, np.nan)[0]
+
+
+if NUMBA_AVAILABLE:
+    # Compile (or load from the on-disk cache) now rather than on first use
+    _z = np.zeros(2)
+    rolling_mean(_z, 2, 0)
+    ewma_extend(_z, 0.5, 0.0, 0.0, np.nan)
+    _z2 = np.zeros((2, 3))
+    rolling_mean_2d(_z2, 2, 0)
+    ewma_extend_2d(_z2, 0.5, ewma_state(3))
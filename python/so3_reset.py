@@ -1,20 +1,48 @@
 # python/so3_reset.py
-# Minimal, dependency-light SO(3) resetability utilities (NumPy only).
-# API:
+# Minimal, dependency-light SO(3) resetability utilities (NumPy only;
+# Numba is used to JIT the hot kernels when it is installed).
+# API (seq is a RotSeq of SoA arrays or a list of (axis, angle) pairs):
 #   - estimate_lambda_and_R(seq) -> (lambda, R, theta_net)
 #   - compose_seq(seq) -> quaternion
+#   - compose_seq_arr(axes, thetas) -> quaternion (same, on (N,3)/(N,) arrays)
 #   - SO3ResetStream: push small increments then finalize/reset
 
-from typing import List, Tuple
+import math
+from dataclasses import dataclass
+from typing import List, Tuple, Union
 
 import numpy as np
 
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional: kernels then run as plain Python
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
 Array = np.ndarray
 
 
 def quat_mul(a: Array, b: Array) -> Array:
-    w1, x1, y1, z1 = a
-    w2, x2, y2, z2 = b
+    if (
+        type(a) is np.ndarray and type(b) is np.ndarray
+        and a.dtype == b.dtype == np.float64 and a.ndim == b.ndim == 1
+    ):
+        # Single float64 quaternions: Python floats are several times faster
+        # than NumPy scalar arithmetic and give the same float64 result.
+        w1, x1, y1, z1 = a.tolist()
+        w2, x2, y2, z2 = b.tolist()
+    else:
+        # Anything else keeps the input's (promoted) dtype and leading-axis shape
+        w1, x1, y1, z1 = a
+        w2, x2, y2, z2 = b
     return np.array(
         [
             w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
@@ -29,44 +57,109 @@ def quat_normalize(q: Array) -> Array:
     return q / (np.linalg.norm(q) + 1e-15)
 
 
+def _axang_to_quat_s(nx: float, ny: float, nz: float, th: float):
+    """Scalar axis-angle → (w, x, y, z); the axis need not be unit length."""
+    s = math.sin(th / 2) / (math.sqrt(nx * nx + ny * ny + nz * nz) + 1e-12)
+    return math.cos(th / 2), s * nx, s * ny, s * nz
+
+
 def axang_to_quat(n: Array, th: float) -> Array:
-    n = np.asarray(n, float)
-    n /= np.linalg.norm(n) + 1e-12
-    c, s = np.cos(th / 2), np.sin(th / 2)
-    return np.array([c, *(s * n)])
+    nx, ny, nz = n
+    return np.array(_axang_to_quat_s(float(nx), float(ny), float(nz), float(th)))
 
 
-def quat_to_axang(q: Array) -> Tuple[Array, float]:
-    q = quat_normalize(q)
-    w = np.clip(q[0], -1.0, 1.0)
-    th = 2 * np.arccos(w)
+def _quat_to_axang_s(w: float, x: float, y: float, z: float):
+    """Scalar quat_to_axang: (nx, ny, nz, theta) with plain float math."""
+    inv = 1.0 / (math.sqrt(w * w + x * x + y * y + z * z) + 1e-15)
+    w, x, y, z = w * inv, x * inv, y * inv, z * inv
+    w = min(max(w, -1.0), 1.0)
+    th = 2.0 * math.acos(w)
     if th < 1e-12:
-        return np.array([1.0, 0.0, 0.0]), 0.0
-    s = np.sqrt(max(1 - w * w, 1e-12))
-    n = q[1:] / s
-    return n, th
+        return 1.0, 0.0, 0.0, 0.0
+    inv_s = 1.0 / math.sqrt(max(1.0 - w * w, 1e-12))
+    return x * inv_s, y * inv_s, z * inv_s, th
+
+
+def quat_to_axang(q: Array) -> Tuple[Array, float]:
+    w, x, y, z = q
+    nx, ny, nz, th = _quat_to_axang_s(float(w), float(x), float(y), float(z))
+    return np.array([nx, ny, nz]), th
+
+
+@dataclass
+class RotSeq:
+    """A sequence of axis-angle increments as SoA arrays: axes (N,3), angles (N,).
+
+    Iterating yields (axis, angle) pairs, so a RotSeq can stand in for the
+    list-of-tuples form accepted by the functions below.
+    """
+
+    axes: Array
+    thetas: Array
+
+    @classmethod
+    def from_pairs(cls, seq: List[Tuple[Array, float]]) -> "RotSeq":
+        axes = np.array([n for n, _ in seq], dtype=float).reshape(-1, 3)
+        thetas = np.array([th for _, th in seq], dtype=float)
+        return cls(axes, thetas)
+
+    def __len__(self) -> int:
+        return len(self.thetas)
+
+    def __iter__(self):
+        return zip(self.axes, self.thetas.tolist())
+
 
+Seq = Union[RotSeq, List[Tuple[Array, float]]]
 
-def compose_seq(seq: List[Tuple[Array, float]]) -> Array:
-    q = np.array([1.0, 0.0, 0.0, 0.0])
-    for n, th in seq:
-        q = quat_mul(axang_to_quat(n, th), q)
+
+def _as_rotseq(seq: Seq) -> RotSeq:
+    return seq if isinstance(seq, RotSeq) else RotSeq.from_pairs(seq)
+
+
+def compose_seq_arr(axes: Array, thetas: Array, theta_scale: float = 1.0) -> Array:
+    """compose_seq for (N,3) axes and (N,) angles given as arrays, with every
+    angle multiplied by theta_scale inside the fold."""
+    axes = np.ascontiguousarray(axes, dtype=np.float64)
+    thetas = np.ascontiguousarray(thetas, dtype=np.float64)
+    # axis-angle → quaternion and the fold run together in one JIT loop
+    q = np.array(_compose_nb(axes, thetas, 0, len(thetas), float(theta_scale)))
     return quat_normalize(q)
 
 
-def estimate_lambda_and_R(seq: List[Tuple[Array, float]]):
-    """Return lambda=pi/theta_net, R=1-|w(q_reset)|, theta_net (rad).
-    Here R≈0 means 'good reset' (low commutator residual)."""
-    if not seq:
-        return 1.0, 1.0, 0.0
-    qnet = compose_seq(seq)
+def compose_seq(seq: Seq) -> Array:
+    rs = _as_rotseq(seq)
+    return compose_seq_arr(rs.axes, rs.thetas)
+
+
+def _reset_terms(compose):
+    """(lambda, R, theta_net, q_net, q_reset) given compose(scale) -> unit
+    quaternion of the sequence with every angle multiplied by scale.
+    Each of the two compositions is done exactly once."""
+    qnet = compose(1.0)
     _, th = quat_to_axang(qnet)
     lam = np.pi / th if th > 1e-12 else 1.0
-    scaled = [(n, lam * thk) for (n, thk) in seq]
-    q1 = compose_seq(scaled)
+    q1 = compose(lam)
     qreset = quat_mul(q1, q1)  # apply scaled sequence twice
     R = 1.0 - abs(np.clip(qreset[0], -1.0, 1.0))  # corrected, treats q and -q same
-    return float(lam), float(R), float(th)
+    return float(lam), float(R), float(th), qnet, qreset
+
+
+def estimate_lambda_and_R_arr(axes: Array, thetas: Array):
+    """estimate_lambda_and_R for (N,3) axes and (N,) angles given as arrays."""
+    thetas = np.asarray(thetas, dtype=float)
+    if len(thetas) == 0:
+        return 1.0, 1.0, 0.0
+    return _reset_terms(lambda scale: compose_seq_arr(axes, thetas, scale))[:3]
+
+
+def estimate_lambda_and_R(seq: Seq):
+    """Return lambda=pi/theta_net, R=1-|w(q_reset)|, theta_net (rad).
+    Here R≈0 means 'good reset' (low commutator residual)."""
+    if not seq:
+        return 1.0, 1.0, 0.0
+    rs = _as_rotseq(seq)
+    return estimate_lambda_and_R_arr(rs.axes, rs.thetas)
 
 
 class SO3ResetStream:
@@ -75,23 +168,75 @@ class SO3ResetStream:
     def __init__(self, window_sec: float = 0.2, dt: float = 0.005):
         self.dt = dt
         self.N = max(1, int(window_sec / dt))
-        self.buf: List[Tuple[Array, float]] = []
+        # Ring buffer of the last N increments as float32 SoA columns (unit axis
+        # x/y/z, angle); folds accumulate in float64. _len counts every push.
+        self._nx = np.empty(self.N, dtype=np.float32)
+        self._ny = np.empty(self.N, dtype=np.float32)
+        self._nz = np.empty(self.N, dtype=np.float32)
+        self._thetas = np.empty(self.N, dtype=np.float32)
+        self._len = 0
+
+    def push_increment(self, nx: float, ny: float, nz: float, dtheta: float):
+        """Scalar fast path of push_axis_angle_increment (no NumPy dispatch)."""
+        n2 = nx * nx + ny * ny + nz * nz
+        if n2 < 1e-24 or abs(dtheta) < 1e-12:
+            return
+        inv = 1.0 / (math.sqrt(n2) + 1e-12)
+        k = self._len % self.N
+        self._nx[k] = nx * inv
+        self._ny[k] = ny * inv
+        self._nz[k] = nz * inv
+        self._thetas[k] = dtheta
+        self._len += 1
 
     def push_axis_angle_increment(self, n: Array, dtheta: float):
-        n = np.asarray(n, float)
-        if np.linalg.norm(n) < 1e-12 or abs(dtheta) < 1e-12:
-            return
-        n = n / (np.linalg.norm(n) + 1e-12)
-        self.buf.append((n, float(dtheta)))
-        if len(self.buf) > self.N:
-            self.buf.pop(0)
+        nx, ny, nz = n
+        self.push_increment(float(nx), float(ny), float(nz), float(dtheta))
+
+    def _chronological(self, col: Array) -> Array:
+        if self._len <= self.N:
+            return col[: self._len]
+        k = self._len % self.N
+        return np.concatenate((col[k:], col[:k]))
+
+    def window(self) -> Tuple[Array, Array]:
+        """Buffered increments, oldest first, as float64 (axes (n,3), angles (n,))."""
+        axes = np.column_stack(
+            [self._chronological(c) for c in (self._nx, self._ny, self._nz)]
+        ).astype(np.float64)
+        return axes, self._chronological(self._thetas).astype(np.float64)
+
+    def rotseq(self) -> RotSeq:
+        """The buffered increments, oldest first, as a RotSeq."""
+        return RotSeq(*self.window())
+
+    @property
+    def buf(self) -> List[Tuple[Array, float]]:
+        return list(self.rotseq())
+
+    def _compose_window(self, scale: float = 1.0) -> Array:
+        """Fold the buffered increments oldest first without unrolling the ring:
+        the older segment [k:n) then the newer one [0:k)."""
+        n = min(self._len, self.N)
+        k = self._len % self.N if self._len > self.N else 0
+        cols = (self._nx, self._ny, self._nz, self._thetas)
+        q_old = _compose_soa_nb(*cols, k, n, scale)
+        q_new = _compose_soa_nb(*cols, 0, k, scale)
+        return quat_normalize(np.array(_qmul_nb(*q_new, *q_old)))
 
     def lambda_R_theta(self):
-        return estimate_lambda_and_R(self.buf)
+        if self._len == 0:
+            return 1.0, 1.0, 0.0
+        return _reset_terms(self._compose_window)[:3]
 
-    def build_scaled_twice(self, lam: float):
+    def build_scaled_twice(self, lam: float) -> List[Tuple[Array, float]]:
         return [(n, lam * th) for (n, th) in self.buf] * 2
 
+    def rotseq_scaled_twice(self, lam: float) -> RotSeq:
+        """build_scaled_twice as a RotSeq, without the per-step tuples."""
+        axes, thetas = self.window()
+        return RotSeq(np.concatenate((axes, axes)), lam * np.concatenate((thetas, thetas)))
+
 
 # -------------------------------------------------------
 # Quaternion helper (now top-level, not inside class)
@@ -110,14 +255,14 @@ def quat_conj(q):
 # BEGIN NEW SECTION: Counterfactual Resetability Prediction
 # --------------------------------------------------------------------
 def predict_reset_benefit(
-    seq: List[Tuple[Array, float]], q_current: Array
+    seq: Seq, q_current: Array
 ) -> Tuple[float, float, float, float, float, float]:
     """
     Estimate how much a λ-scaled reset would improve attitude recovery.
 
     Parameters
     ----------
-    seq : list of (axis, angle)
+    seq : RotSeq or list of (axis, angle)
         Recent rotation increments (same input as estimate_lambda_and_R)
     q_current : array([w,x,y,z])
         Current quaternion orientation (normalized)
@@ -140,15 +285,18 @@ def predict_reset_benefit(
     if not seq:
         return 0.0, 0.0, 0.0, 1.0, 1.0, 0.0
 
-    lam, R, theta_net = estimate_lambda_and_R(seq)
+    rs = _as_rotseq(seq)
+    axes, thetas = rs.axes, rs.thetas
+    lam, R, theta_net, qnet, qreset = _reset_terms(
+        lambda scale: compose_seq_arr(axes, thetas, scale)
+    )
 
     # Predict future attitude if continuing the current motion
-    q_future = quat_mul(compose_seq(seq), q_current)
+    q_future = quat_mul(qnet, q_current)
     _, th_noreset = quat_to_axang(q_future)
 
-    # Predict attitude if we had applied a λ-scaled reset twice
-    scaled_twice = [(n, lam * th) for (n, th) in seq] * 2
-    q_reset = quat_mul(compose_seq(scaled_twice), q_current)
+    # Predict attitude if we had applied a λ-scaled reset twice (q1∘q1)
+    q_reset = quat_mul(qreset, q_current)
     _, th_withreset = quat_to_axang(q_reset)
 
     benefit_deg = np.degrees(th_noreset - th_withreset)
@@ -165,3 +313,172 @@ def predict_reset_benefit(
 # --------------------------------------------------------------------
 # END NEW SECTION
 # --------------------------------------------------------------------
+
+
+# --------------------------------------------------------------------
+# Batched variants: B independent sequences as SoA arrays,
+# axes (B,N,3) and angles (B,N). Same math as the scalar API above.
+# --------------------------------------------------------------------
+def quat_conj_vec(Q: Array) -> Array:
+    """Batched quaternion conjugate for a (...,4) array (float32 stays float32)."""
+    Q = np.asarray(Q)
+    out = Q.astype(np.result_type(Q, np.float32))
+    out[..., 1:] *= -1.0
+    return out
+
+
+def quat_mul_vec(A: Array, B: Array) -> Array:
+    """Batched Hamilton product of two (...,4) quaternion arrays."""
+    w1, x1, y1, z1 = A[..., 0], A[..., 1], A[..., 2], A[..., 3]
+    w2, x2, y2, z2 = B[..., 0], B[..., 1], B[..., 2], B[..., 3]
+    return np.stack(
+        [
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+        ],
+        axis=-1,
+    )
+
+
+def quat_to_axang_vec(Q: Array) -> Tuple[Array, Array]:
+    """Batched quat_to_axang: (...,4) quaternions → (...,3) axes, (...) angles."""
+    Q = Q / (np.linalg.norm(Q, axis=-1, keepdims=True) + 1e-15)
+    w = np.clip(Q[..., 0], -1.0, 1.0)
+    thetas = 2 * np.arccos(w)
+    axes = Q[..., 1:] / np.sqrt(np.maximum(1 - w * w, 1e-12))[..., None]
+    still = thetas < 1e-12
+    axes[still] = (1.0, 0.0, 0.0)
+    thetas[still] = 0.0
+    return axes, thetas
+
+
+def compose_seq_batch(axes: Array, thetas: Array) -> Array:
+    """Batched compose_seq: (B,N,3) axes, (B,N) angles → (B,4) quaternions."""
+    u = axes / (np.linalg.norm(axes, axis=-1, keepdims=True) + 1e-12)
+    half = 0.5 * thetas
+    steps = np.concatenate([np.cos(half)[..., None], np.sin(half)[..., None] * u], axis=-1)
+    q = np.zeros((steps.shape[0], 4))
+    q[:, 0] = 1.0
+    for k in range(steps.shape[1]):
+        q = quat_mul_vec(steps[:, k], q)
+    return q / (np.linalg.norm(q, axis=-1, keepdims=True) + 1e-15)
+
+
+def estimate_lambda_and_R_batch(axes: Array, thetas: Array):
+    """Batched estimate_lambda_and_R → (lambda, R, theta_net), each shape (B,)."""
+    _, th = quat_to_axang_vec(compose_seq_batch(axes, thetas))
+    lam = np.where(th > 1e-12, np.pi / np.maximum(th, 1e-12), 1.0)
+    q1 = compose_seq_batch(axes, lam[:, None] * thetas)
+    qreset = quat_mul_vec(q1, q1)
+    R = 1.0 - np.abs(np.clip(qreset[:, 0], -1.0, 1.0))
+    return lam, R, th
+
+
+def predict_reset_benefit_batch(axes: Array, thetas: Array, q_current: Array):
+    """Batched predict_reset_benefit; q_current is (4,) or (B,4).
+
+    Returns the same six quantities as predict_reset_benefit, each shape (B,).
+    """
+    lam, R, theta_net = estimate_lambda_and_R_batch(axes, thetas)
+    q_current = np.broadcast_to(q_current, (len(lam), 4))
+
+    q_future = quat_mul_vec(compose_seq_batch(axes, thetas), q_current)
+    _, th_noreset = quat_to_axang_vec(q_future)
+
+    # λ-scaled sequence applied twice == (scaled composition) squared
+    q1 = compose_seq_batch(axes, lam[:, None] * thetas)
+    q_twice = quat_mul_vec(q1, q1)
+    q_twice /= np.linalg.norm(q_twice, axis=-1, keepdims=True) + 1e-15
+    _, th_withreset = quat_to_axang_vec(quat_mul_vec(q_twice, q_current))
+
+    benefit_deg = np.degrees(th_noreset - th_withreset)
+    return (
+        benefit_deg,
+        np.degrees(th_noreset),
+        np.degrees(th_withreset),
+        lam,
+        R,
+        theta_net,
+    )
+
+
+# --------------------------------------------------------------------
+# JIT kernels: scalar ports of compose_seq / estimate_lambda_and_R /
+# predict_reset_benefit for one sequence, called from parallel loops.
+# No fastmath: it lets LLVM assume no NaNs, which drops the guards below
+# and turns NaN telemetry rows into wrong numbers instead of NaN results.
+# --------------------------------------------------------------------
+@njit(cache=True)
+def _qmul_nb(w1, x1, y1, z1, w2, x2, y2, z2):
+    return (
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+    )
+
+
+@njit(cache=True)
+def _compose_nb(axes, thetas, lo, hi, scale):
+    """Fold axis-angle steps lo..hi-1 (angles × scale) into one quaternion."""
+    w, x, y, z = 1.0, 0.0, 0.0, 0.0
+    for j in range(lo, hi):
+        nx, ny, nz = axes[j, 0], axes[j, 1], axes[j, 2]
+        half = 0.5 * scale * thetas[j]
+        s = math.sin(half) / (math.sqrt(nx * nx + ny * ny + nz * nz) + 1e-12)
+        w, x, y, z = _qmul_nb(math.cos(half), s * nx, s * ny, s * nz, w, x, y, z)
+    return w, x, y, z
+
+
+@njit(cache=True)
+def _compose_soa_nb(nx, ny, nz, thetas, lo, hi, scale):
+    """_compose_nb for axes stored as separate (float32) x/y/z columns."""
+    w, x, y, z = 1.0, 0.0, 0.0, 0.0
+    for j in range(lo, hi):
+        ax, ay, az = nx[j], ny[j], nz[j]
+        half = 0.5 * scale * thetas[j]
+        s = math.sin(half) / (math.sqrt(ax * ax + ay * ay + az * az) + 1e-12)
+        w, x, y, z = _qmul_nb(math.cos(half), s * ax, s * ay, s * az, w, x, y, z)
+    return w, x, y, z
+
+
+@njit(cache=True)
+def _angle_nb(w, x, y, z):
+    """Rotation angle of a (not necessarily unit) quaternion, as quat_to_axang."""
+    w = w / (math.sqrt(w * w + x * x + y * y + z * z) + 1e-15)
+    th = 2.0 * math.acos(min(max(w, -1.0), 1.0))
+    return 0.0 if th < 1e-12 else th  # NaN falls through, as in quat_to_axang
+
+
+@njit(cache=True)
+def _reset_metrics_nb(axes, thetas, lo, hi, cw, cx, cy, cz):
+    """(R, theta_net [rad], benefit [deg]) for steps lo..hi-1 and unit q_current."""
+    # estimate_lambda_and_R
+    w, x, y, z = _compose_nb(axes, thetas, lo, hi, 1.0)
+    n = math.sqrt(w * w + x * x + y * y + z * z) + 1e-15
+    w, x, y, z = w / n, x / n, y / n, z / n
+    th_net = _angle_nb(w, x, y, z)
+    lam = math.pi / th_net if th_net > 1e-12 else 1.0
+    w1, x1, y1, z1 = _compose_nb(axes, thetas, lo, hi, lam)
+    n1 = math.sqrt(w1 * w1 + x1 * x1 + y1 * y1 + z1 * z1) + 1e-15
+    rw = _qmul_nb(w1 / n1, x1 / n1, y1 / n1, z1 / n1,
+                  w1 / n1, x1 / n1, y1 / n1, z1 / n1)[0]
+    R = 1.0 - abs(min(max(rw, -1.0), 1.0))
+
+    # predict_reset_benefit
+    fw, fx, fy, fz = _qmul_nb(w, x, y, z, cw, cx, cy, cz)
+    th_noreset = _angle_nb(fw, fx, fy, fz)
+    tw, tx, ty, tz = _qmul_nb(w1, x1, y1, z1, w1, x1, y1, z1)
+    nt = math.sqrt(tw * tw + tx * tx + ty * ty + tz * tz) + 1e-15
+    tw, tx, ty, tz = _qmul_nb(tw / nt, tx / nt, ty / nt, tz / nt, cw, cx, cy, cz)
+    th_withreset = _angle_nb(tw, tx, ty, tz)
+    return R, th_net, math.degrees(th_noreset - th_withreset)
+
+
+if NUMBA_AVAILABLE:
+    # Compile (or load from the on-disk cache) now rather than on first use
+    _compose_nb(np.zeros((1, 3)), np.zeros(1), 0, 1, 1.0)
+    _z32 = np.zeros(1, dtype=np.float32)
+    _compose_soa_nb(_z32, _z32, _z32, _z32, 0, 1, 1.0)
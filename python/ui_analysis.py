@@ -2,12 +2,29 @@
 # ui_analysis.py (Final, Replay Button Fixed)
 # ==========================================================
 from pathlib import Path
+import io
+import re
 import streamlit as st
 import pandas as pd
 
 # --- Import from shared modules ---
 from python.ui_helpers import make_summary_table
-from python.report_utils import export_pdf
+from python.report_utils import export_pdf, export_pdfs_batch
+
+EVENTS_PER_PAGE = 50
+
+# ----------------------------------------------------------
+# Event log loading
+# ----------------------------------------------------------
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_events(path: str, mtime: float, size: int) -> pd.DataFrame:
+    """Event log sorted newest first; re-read only when the file changes
+    (mtime/size are part of the cache key). The logger may be mid-append,
+    so anything after the last newline is an incomplete row and is dropped."""
+    data = Path(path).read_bytes()
+    df = pd.read_csv(io.BytesIO(data[: data.rfind(b"\n") + 1]))
+    return df.sort_values("timestamp", ascending=False).reset_index(drop=True)
+
 
 # ----------------------------------------------------------
 # Main Renderer
@@ -30,19 +47,20 @@ def render_analysis_tab(st, DOMAIN_COLORS):
         return
 
     try:
-        df_events = pd.read_csv(event_log)
+        stat = event_log.stat()
+        df_events = _load_events(str(event_log), stat.st_mtime, stat.st_size)
         if df_events.empty:
             st.info("No reset events have been logged yet."); return
-        df_events = df_events.sort_values("timestamp", ascending=False).reset_index(drop=True)
     except Exception as e:
         st.error(f"Could not read the event log file: {e}"); return
 
     # --- Quick Stats Bar ---
+    stats = df_events.agg({"timestamp": "max", "R": "mean", "predicted_benefit_deg": "mean"})
     c = st.columns(4)
     c[0].metric("Total Events", len(df_events))
-    c[1].metric("Last Timestamp [s]", f"{df_events['timestamp'].max():.2f}")
-    c[2].metric("Mean R", f"{df_events['R'].mean():.4f}")
-    c[3].metric("Mean Δθ [deg]", f"{df_events['predicted_benefit_deg'].mean():.2f}")
+    c[1].metric("Last Timestamp [s]", f"{stats['timestamp']:.2f}")
+    c[2].metric("Mean R", f"{stats['R']:.4f}")
+    c[3].metric("Mean Δθ [deg]", f"{stats['predicted_benefit_deg']:.2f}")
     st.markdown("---")
 
     # --- Domain Filter Bar ---
@@ -64,30 +82,36 @@ def render_analysis_tab(st, DOMAIN_COLORS):
     header_cols[4].markdown("**Benefit (deg)**")
     header_cols[5].markdown("**Replay**")
 
+    # Only one page of rows is rendered: every row costs six Streamlit widgets per rerun
+    n_pages = -(-len(df_filtered) // EVENTS_PER_PAGE)
+    page = st.number_input("Page", 1, n_pages, 1, key="events_page") if n_pages > 1 else 1
+    df_page = df_filtered.iloc[(page - 1) * EVENTS_PER_PAGE : page * EVENTS_PER_PAGE]
+    badge_colors = df_page["domain"].map(DOMAIN_COLORS).fillna("#999").to_numpy()
+
     # Table Rows
-    for i, row in df_filtered.iterrows():
+    rows = zip(df_page.index, badge_colors, *(df_page[c].to_numpy() for c in ["domain", "timestamp", "R", "theta_net_deg", "predicted_benefit_deg"]))
+    for i, color, domain, ts, R, theta, benefit in rows:
         cols = st.columns([1.2, 1, 1, 1, 1, 0.5])
         
-        color = DOMAIN_COLORS.get(row["domain"], "#999")
-        badge_html = f'<span class="event-badge" style="background-color:{color};">{row["domain"]}</span>'
+        badge_html = f'<span class="event-badge" style="background-color:{color};">{domain}</span>'
         cols[0].markdown(badge_html, unsafe_allow_html=True)
         
-        cols[1].text(f"{row['timestamp']:.2f}s")
-        cols[2].text(f"{row['R']:.4f}")
-        cols[3].text(f"{row['theta_net_deg']:.2f}°")
-        cols[4].text(f"{row['predicted_benefit_deg']:.2f}°")
+        cols[1].text(f"{ts:.2f}s")
+        cols[2].text(f"{R:.4f}")
+        cols[3].text(f"{theta:.2f}°")
+        cols[4].text(f"{benefit:.2f}°")
 
         # --- THIS IS THE FIX (PART 2) ---
         # When the button is clicked, set both the event data and the message flag.
         if cols[5].button("🎞️", key=f"replay_{i}", help="Replay this event"):
-            ss.selected_event = dict(row)
+            ss.selected_event = dict(df_filtered.loc[i])
             ss.show_replay_message = True # Set the flag to show the info message
             st.rerun()
 
     # --- Summary & Export sections ---
     st.markdown("---")
     st.markdown("### 📋 Summary by Domain")
-    st.dataframe(make_summary_table(df_filtered), width='stretch')
+    st.dataframe(make_summary_table(df_filtered, (stat.st_mtime, stat.st_size, tuple(active_domains))), width='stretch')
 
     st.markdown("---")
     st.markdown("### 📜 Generate PDF Report")
@@ -97,4 +121,12 @@ def render_analysis_tab(st, DOMAIN_COLORS):
             export_pdf(df_filtered, df_filtered, str(report_path))
             st.success(f"✅ Report saved to `{report_path}`")
             with open(report_path, "rb") as f:
-                st.download_button("📥 Download PDF Report", f, "analysis_report.pdf", "application/pdf", width='stretch')
\ No newline at end of file
+                st.download_button("📥 Download PDF Report", f, "analysis_report.pdf", "application/pdf", width='stretch')
+    if st.button("Generate all-domain reports", width='stretch', help="One PDF per selected domain"):
+        with st.spinner("Creating per-domain PDF reports..."):
+            jobs = []
+            for dom, df_dom in df_filtered.groupby("domain", sort=False):
+                slug = re.sub(r"[^A-Za-z0-9]+", "_", str(dom)).strip("_").lower() or "domain"
+                jobs.append((df_dom, df_dom, f"results/analysis_report_{slug}.pdf"))
+            paths = export_pdfs_batch(jobs)
+            st.success("✅ Reports saved to " + ", ".join(f"`{p}`" for p in paths))
\ No newline at end of file
@@ -5,50 +5,69 @@
 # and visualization used across all tabs.
 # ==========================================================
 
-import matplotlib.pyplot as plt
+import io
+import os
+import types
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
+from streamlit.runtime.uploaded_file_manager import UploadedFile
 
-from python.core_math import quat_to_R
+from python.core_math import analyze_from_quats, analyze_quat_array, mean_speed, quat_to_R
+from python.domains._common import SUMMARY_COLUMNS
+from python.lttb import lttb_indices
+from python.smoothing_nb import rolling_mean, smooth_series
 
 
 # ==========================================================
 # UI Components
 # ==========================================================
+_PULSE_CSS = """
+<style>
+@keyframes pulse {
+    0% { transform: scale(1); opacity: 1; }
+    50% { transform: scale(1.4); opacity: 0.4; }
+    100% { transform: scale(1); opacity: 1; }
+}
+.live-dot {
+    display:inline-block;
+    width:12px; height:12px;
+    border-radius:50%;
+    margin-right:6px;
+    background-color:#00cc66;
+    animation:pulse 1s infinite ease-in-out;
+}
+.paused-dot {
+    display:inline-block;
+    width:12px; height:12px;
+    border-radius:50%;
+    margin-right:6px;
+    background-color:#cc3333;
+}
+</style>
+"""
+
+
+def inject_status_css(st):
+    """Emit the live/paused dot styles used by render_status_bar.
+
+    Call once per script run from outside any fragment, so fragment reruns
+    only resend the small status HTML.
+    """
+    st.markdown(_PULSE_CSS, unsafe_allow_html=True)
+
+
 def render_status_bar(
     st, domain, domain_colors, sim_mode, running, sim_idx, total_frames
 ):
-    """Renders the top status bar with a pulsing dot for live status."""
-    color = domain_colors.get(domain, "#ccc")
-    mode_txt = "Simulation" if sim_mode else "Live"
+    """Renders the top status bar with a pulsing dot for live status.
 
-    pulse_css = """
-    <style>
-    @keyframes pulse {
-        0% { transform: scale(1); opacity: 1; }
-        50% { transform: scale(1.4); opacity: 0.4; }
-        100% { transform: scale(1); opacity: 1; }
-    }
-    .live-dot {
-        display:inline-block;
-        width:12px; height:12px;
-        border-radius:50%;
-        margin-right:6px;
-        background-color:#00cc66;
-        animation:pulse 1s infinite ease-in-out;
-    }
-    .paused-dot {
-        display:inline-block;
-        width:12px; height:12px;
-        border-radius:50%;
-        margin-right:6px;
-        background-color:#cc3333;
-    }
-    </style>
+    Needs the styles from inject_status_css on the page.
     """
-    st.markdown(pulse_css, unsafe_allow_html=True)
+    color = domain_colors.get(domain, "#ccc")
+    mode_txt = "Simulation" if sim_mode else "Live"
 
     dot_class = "live-dot" if running else "paused-dot"
     html = f"""
@@ -65,19 +84,296 @@ def render_status_bar(
 # ==========================================================
 # Data loading & Aggregation
 # ==========================================================
-@st.cache_data(show_spinner=False, ttl=1.0)
+@st.cache_data(
+    show_spinner=False,
+    max_entries=8,
+    hash_funcs={
+        types.ModuleType: lambda m: m.__name__,
+        UploadedFile: lambda f: f.file_id,
+    },
+)
+def _load_domain_telemetry(domain_module, path, mtime, size):
+    # mtime/size are unused here; they are part of the cache key so that a
+    # file that changed on disk is loaded again.
+    if hasattr(path, "seek"):
+        path.seek(0)  # an upload may already have been read by an earlier miss
+    return domain_module.load_telemetry(path)
+
+
 def load_domain_telemetry(domain_module, path):
-    """Load telemetry CSV via domain-specific loader, safely cached."""
+    """Load telemetry CSV via domain-specific loader, cached per file version."""
     try:
-        return domain_module.load_telemetry(path)
+        if isinstance(path, (str, os.PathLike)):
+            stat = os.stat(path)
+            mtime, size = stat.st_mtime, stat.st_size
+        else:  # uploaded file: keyed by its file_id
+            mtime = size = None
+        return _load_domain_telemetry(domain_module, path, mtime, size)
     except Exception as e:
         st.error(f"Failed to load telemetry for {domain_module.__name__}: {e}")
         return pd.DataFrame()
 
 
-@st.cache_data(show_spinner=False)
-def make_summary_table(df):
-    """Aggregate results by domain for quick summary."""
+QUAT_COLUMNS = ["qw", "qx", "qy", "qz"]
+
+
+def _quat_array(df):
+    return np.ascontiguousarray(df[QUAT_COLUMNS].to_numpy(), dtype=np.float64)
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        return f.readline()
+
+
+def _rows_end(path, n_rows):
+    """Byte offset just past the header and the first n_rows lines, or None if
+    the file holds fewer complete lines than that."""
+    with open(path, "rb") as f:
+        newlines = np.flatnonzero(np.frombuffer(f.read(), dtype=np.uint8) == ord("\n"))
+    return int(newlines[n_rows]) + 1 if len(newlines) > n_rows else None
+
+
+def incremental_load(domain_module, path):
+    """load_domain_telemetry for append-only CSVs, parsing only new rows.
+
+    The last result, its byte offset and header line are kept in
+    session_state; when the same file has only grown, the bytes after the
+    offset (up to the last complete line) are parsed with the cached dtypes
+    and appended, both to the frame and to the (N, 4) float64 quaternion
+    array returned by telemetry_quats. Anything else (other file, shrink,
+    header change, uploads, non-CSV) falls back to a full
+    load_domain_telemetry.
+    """
+    ss = st.session_state
+    if not (isinstance(path, (str, os.PathLike)) and os.fspath(path).endswith(".csv")):
+        ss.pop("_csv_cache", None)
+        return load_domain_telemetry(domain_module, path)
+
+    path = os.fspath(path)
+    cache = ss.get("_csv_cache")
+    try:
+        size = os.path.getsize(path)
+        header = _read_header(path)
+    except OSError:
+        cache = None
+        size = header = None
+    if (
+        cache is not None
+        and cache["path"] == path
+        and cache["domain"] == domain_module.__name__
+        and cache["header"] == header
+        and size >= cache["size"]
+    ):
+        if size == cache["size"]:
+            return cache["df"]
+        with open(path, "rb") as f:
+            f.seek(cache["size"])
+            tail = f.read(size - cache["size"])
+        tail = tail[: tail.rfind(b"\n") + 1]  # leave a partially written row
+        if not tail:
+            return cache["df"]
+        new_rows = pd.read_csv(
+            io.BytesIO(tail),
+            header=None,
+            names=list(cache["dtypes"]),
+            dtype=cache["dtypes"],
+        )
+        cache["df"] = pd.concat([cache["df"], new_rows], ignore_index=True)
+        cache["quats"] = np.concatenate([cache["quats"], _quat_array(new_rows)])
+        if "speed" in cache:
+            sums, counts = cache["speed"]
+            new_sums, new_counts = _speed_prefix(new_rows, sums[-1], counts[-1])
+            cache["speed"] = (np.concatenate([sums, new_sums]), np.concatenate([counts, new_counts]))
+        cache["size"] += len(tail)
+        return cache["df"]
+
+    df = load_domain_telemetry(domain_module, path)
+    # The offset comes from the rows actually parsed, not from the size stat'ed
+    # above: the logger may have appended more rows before the parse.
+    end = None
+    if not df.empty and header is not None:
+        end = _rows_end(path, len(df))
+        if end is None and len(df) > 1:  # the last row was still being written
+            df = df.iloc[:-1]
+            end = _rows_end(path, len(df))
+    if end is None:
+        ss.pop("_csv_cache", None)
+    else:
+        ss["_csv_cache"] = {
+            "path": path,
+            "domain": domain_module.__name__,
+            "header": header,
+            "size": end,
+            "df": df,
+            "dtypes": df.dtypes.to_dict(),
+            "quats": _quat_array(df),
+        }
+    return df
+
+
+def telemetry_quats(df):
+    """Contiguous (N, 4) float64 quaternions of a frame from incremental_load.
+
+    Reuses the array kept next to the cached frame; other frames (uploads)
+    are converted on the spot.
+    """
+    cache = st.session_state.get("_csv_cache")
+    if cache is not None and cache["df"] is df:
+        return cache["quats"]
+    return _quat_array(df)
+
+
+SPEED_COLUMNS = ["wx", "wy", "wz"]
+
+
+def _speed_prefix(df, sum0=0.0, count0=0):
+    """Running sum and count of finite |ω| over the rows of df."""
+    w = df[SPEED_COLUMNS].to_numpy(dtype=np.float64)
+    norms = np.sqrt(np.einsum("ij,ij->i", w, w))
+    valid = ~np.isnan(norms)
+    return sum0 + np.cumsum(np.where(valid, norms, 0.0)), count0 + np.cumsum(valid)
+
+
+def prefix_mean_speed(df, n):
+    """Mean |ω| over the first n rows (NaN rows skipped), or NaN if none.
+
+    For the frame cached by incremental_load the cumulative sums are built
+    once and extended with appended rows, so each call is O(1); other frames
+    are reduced directly with mean_speed.
+    """
+    cache = st.session_state.get("_csv_cache")
+    if cache is None or cache["df"] is not df or n < 1:
+        w = df[SPEED_COLUMNS].to_numpy(dtype=np.float64)[:n]
+        return mean_speed(w[:, 0], w[:, 1], w[:, 2])
+    if "speed" not in cache:
+        cache["speed"] = _speed_prefix(df)
+    sums, counts = cache["speed"]
+    n = min(n, len(counts))
+    return sums[n - 1] / counts[n - 1] if counts[n - 1] else np.nan
+
+
+def summary_means(results_df):
+    """(mean R, mean θ_net, mean benefit) over finite values, NaN for an empty column.
+
+    All three come from one pass over the (N, 3) array, and the result is
+    reused until the results change (row count, first/last timestamp, last R).
+    """
+    n = len(results_df)
+    if n == 0:
+        return (np.nan,) * len(SUMMARY_COLUMNS)
+    key = (n, results_df["timestamp"].iat[0], results_df["timestamp"].iat[-1], results_df["R"].iat[-1])
+    cached = st.session_state.get("_summary_means")
+    if cached is None or cached[0] != key:
+        vals = results_df[list(SUMMARY_COLUMNS)].to_numpy(dtype=np.float64)
+        finite = ~np.isnan(vals)
+        counts = finite.sum(axis=0)
+        sums = np.where(finite, vals, 0.0).sum(axis=0)
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        cached = st.session_state["_summary_means"] = (key, tuple(float(m) for m in means))
+    return cached[1]
+
+
+def _telemetry_hash(df):
+    """Content hash of the columns analyze_from_quats actually reads."""
+    cols = [c for c in ("timestamp", "qw", "qx", "qy", "qz") if c in df.columns]
+    return pd.util.hash_pandas_object(df[cols], index=False).values.tobytes()
+
+
+@st.cache_data(
+    show_spinner=False, max_entries=64, hash_funcs={pd.DataFrame: _telemetry_hash}
+)
+def cached_analyze(df, window, fps):
+    """analyze_from_quats, memoized on telemetry content + window/fps."""
+    return analyze_from_quats(df, window=window, fps=fps)
+
+
+def _array_hash(a):
+    """Full-content hash key (Streamlit samples arrays above 500k elements)."""
+    return a.dtype.str, a.shape, np.ascontiguousarray(a).tobytes()
+
+
+@st.cache_data(
+    show_spinner=False, max_entries=64, hash_funcs={np.ndarray: _array_hash}
+)
+def cached_analyze_quats(quats, timestamps, window, fps):
+    """analyze_quat_array, memoized on array content + window/fps."""
+    return analyze_quat_array(quats, timestamps, window=window, fps=fps)
+
+
+def _latest_candidate(candidates):
+    """(timestamp, R, θ_net [deg], benefit [deg]) of the last candidate, or None."""
+    if candidates.empty:
+        return None
+    return tuple(
+        float(candidates[col].iat[-1])
+        for col in ("timestamp", "R", "theta_net_deg", "predicted_benefit_deg")
+    )
+
+
+def incremental_analyze(quats, timestamps, window, fps):
+    """cached_analyze_quats for a growing prefix, analysing only the new samples.
+
+    The previous (results, candidates) are kept in session_state. If the same
+    window/fps is used and the earlier prefix is unchanged (its last sample
+    and timestamp match), only the window ends added since then are computed,
+    from the window of samples before them, and appended. Otherwise the
+    memoized full analysis is used.
+
+    Returns (results, candidates, latest), where latest is the last
+    candidate as a (timestamp, R, θ_net, benefit) tuple or None; it is only
+    re-read when new candidates arrive.
+    """
+    k = len(quats)
+    if timestamps is None:
+        timestamps = np.arange(k) / max(fps, 1)
+    ss = st.session_state
+    cache = ss.get("_analysis_cache")
+    n = cache["n"] if cache is not None else 0
+    same_prefix = (
+        0 < n <= k
+        and cache["key"] == (window, fps)
+        and np.array_equal(quats[n - 1], cache["q_last"])
+        and timestamps[n - 1] == cache["ts_last"]
+    )
+    if same_prefix and n == k:
+        return cache["results"], cache["candidates"], cache["latest"]
+    if same_prefix and n - 1 > window:
+        lo = n - 1 - window
+        res, cand = analyze_quat_array(quats[lo:k], timestamps[lo:k], window, fps)
+        offset = len(cache["results"])
+        res.index += offset
+        cand.index += offset
+        results = pd.concat([cache["results"], res])
+        candidates = pd.concat([cache["candidates"], cand])
+        latest = _latest_candidate(cand) if len(cand) else cache["latest"]
+    else:
+        results, candidates = cached_analyze_quats(quats, timestamps, window, fps)
+        latest = _latest_candidate(candidates)
+    if k:
+        ss["_analysis_cache"] = {
+            "key": (window, fps),
+            "n": k,
+            "q_last": np.array(quats[k - 1]),
+            "ts_last": timestamps[k - 1],
+            "results": results,
+            "candidates": candidates,
+            "latest": latest,
+        }
+    return results, candidates, latest
+
+
+@st.cache_data(
+    show_spinner=False,
+    max_entries=16,
+    hash_funcs={pd.DataFrame: lambda df: (len(df), tuple(df.columns))},
+)
+def make_summary_table(df, version=None):
+    """Aggregate results by domain for quick summary.
+
+    The frame is keyed only by shape, not content: callers whose data can
+    change at the same length must pass a `version` that identifies it.
+    """
     if df.empty:
         return pd.DataFrame()
     return (
@@ -95,23 +391,21 @@ def make_summary_table(df):
 # ==========================================================
 # 3D attitude visualization
 # ==========================================================
-def make_cube_traces(R, scale=0.25):
-    """Generate cube + body axes Plotly traces given rotation matrix R."""
-    s = scale
-    corners = np.array(
-        [
-            [-s, -s, -s],
-            [s, -s, -s],
-            [s, s, -s],
-            [-s, s, -s],
-            [-s, -s, s],
-            [s, -s, s],
-            [s, s, s],
-            [-s, s, s],
-        ]
-    )
-    Cw = corners @ R.T
-    edges = [
+_CORNERS_UNIT = np.array(
+    [
+        [-1, -1, -1],
+        [1, -1, -1],
+        [1, 1, -1],
+        [-1, 1, -1],
+        [-1, -1, 1],
+        [1, -1, 1],
+        [1, 1, 1],
+        [-1, 1, 1],
+    ],
+    dtype=np.float64,
+)
+_EDGES_IDX = np.array(
+    [
         (0, 1),
         (1, 2),
         (2, 3),
@@ -124,49 +418,47 @@ def make_cube_traces(R, scale=0.25):
         (1, 5),
         (2, 6),
         (3, 7),
-    ]
-    xe, ye, ze = [], [], []
-    for a, b in edges:
-        xa, ya, za = Cw[a]
-        xb, yb, zb = Cw[b]
-        xe += [xa, xb, None]
-        ye += [ya, yb, None]
-        ze += [za, zb, None]
-    cube = go.Scatter3d(x=xe, y=ye, z=ze, mode="lines", line=dict(width=4), name="Body")
-    axes_len = 0.5
+    ],
+    dtype=np.int64,
+)
+_EDGE_GAP = np.full((len(_EDGES_IDX), 1, 3), np.nan)
+_AXIS_COLORS = (("X", "red"), ("Y", "green"), ("Z", "blue"))
+
+
+def _cube_geometry(R, scale=0.25, axes_len=0.5):
+    """NaN-separated cube edge points (N, 3) and body axes as columns of (3, 3)."""
+    R = np.asarray(R, dtype=np.float64)
+    Cw = (_CORNERS_UNIT * scale) @ R.T
+    # (12, 2, 3) edge endpoints, NaN row after each so Plotly breaks the line
+    seg = np.concatenate([Cw[_EDGES_IDX], _EDGE_GAP], axis=1).reshape(-1, 3)
+    # column i of R.T is R.T @ e_i
+    return seg, R.T * axes_len
+
+
+def _traces_from_geometry(seg, axes_world):
+    cube = go.Scatter3d(
+        x=seg[:, 0],
+        y=seg[:, 1],
+        z=seg[:, 2],
+        mode="lines",
+        line=dict(width=4),
+        name="Body",
+    )
     ax_traces = [
         go.Scatter3d(
-            x=[0, (R.T @ [axes_len, 0, 0])[0]],
-            y=[0, (R.T @ [axes_len, 0, 0])[1]],
-            z=[0, (R.T @ [axes_len, 0, 0])[2]],
+            x=[0, axes_world[0, i]],
+            y=[0, axes_world[1, i]],
+            z=[0, axes_world[2, i]],
             mode="lines",
-            line=dict(width=6, color="red"),
-            name="X",
-        ),
-        go.Scatter3d(
-            x=[0, (R.T @ [0, axes_len, 0])[0]],
-            y=[0, (R.T @ [0, axes_len, 0])[1]],
-            z=[0, (R.T @ [0, axes_len, 0])[2]],
-            mode="lines",
-            line=dict(width=6, color="green"),
-            name="Y",
-        ),
-        go.Scatter3d(
-            x=[0, (R.T @ [0, 0, axes_len])[0]],
-            y=[0, (R.T @ [0, 0, axes_len])[1]],
-            z=[0, (R.T @ [0, 0, axes_len])[2]],
-            mode="lines",
-            line=dict(width=6, color="blue"),
-            name="Z",
-        ),
+            line=dict(width=6, color=color),
+            name=name,
+        )
+        for i, (name, color) in enumerate(_AXIS_COLORS)
     ]
     return [cube] + ax_traces
 
 
-def make_3d_figure(qw, qx, qy, qz):
-    """Render 3D cube for given quaternion."""
-    R = quat_to_R(qw, qx, qy, qz)
-    traces = make_cube_traces(R)
+def _figure_from_traces(traces):
     fig = go.Figure(data=traces)
     fig.update_layout(
         scene=dict(
@@ -182,15 +474,158 @@ def make_3d_figure(qw, qx, qy, qz):
     return fig
 
 
-@st.cache_data(show_spinner=False)
+def make_cube_traces(R, scale=0.25):
+    """Generate cube + body axes Plotly traces given rotation matrix R."""
+    return _traces_from_geometry(*_cube_geometry(R, scale))
+
+
+def make_3d_figure(qw, qx, qy, qz):
+    """Render 3D cube for given quaternion."""
+    R = quat_to_R(qw, qx, qy, qz)
+    return _figure_from_traces(make_cube_traces(R))
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def _cube_arrays(qw, qx, qy, qz):
+    """Cube geometry for an already-quantized quaternion."""
+    return _cube_geometry(quat_to_R(qw, qx, qy, qz))
+
+
 def cached_3d_figure(qw, qx, qy, qz):
-    """Cached version of 3D orientation cube."""
-    return make_3d_figure(qw, qx, qy, qz)
+    """Cached version of 3D orientation cube.
+
+    Only the geometry is cached, keyed on the quaternion rounded to 1e-3 so
+    smooth motion keeps hitting the cache; the Figure is assembled per call.
+    """
+    seg, axes_world = _cube_arrays(*(round(float(v), 3) for v in (qw, qx, qy, qz)))
+    return _figure_from_traces(_traces_from_geometry(seg, axes_world))
 
 
 # ==========================================================
 # 2D metric plots
 # ==========================================================
+SMOOTHED_COLUMNS = ("R", "theta_net_deg", "predicted_benefit_deg")
+# Series longer than LTTB_THRESHOLD are downsampled to LTTB_POINTS before plotting
+LTTB_THRESHOLD = 2000
+LTTB_POINTS = 1500
+
+
+def _smoothed_series(results_df, smooth_mode, smooth_strength, smooth_window):
+    """Smoothed plot arrays, extended from session_state on append-only growth.
+
+    Returns a dict with "R_smooth" plus the (possibly smoothed) SMOOTHED_COLUMNS.
+    The cache is reused when the settings match and the previous last row is
+    unchanged; otherwise everything is recomputed from row 0.
+    """
+    n = len(results_df)
+    ts = results_df["timestamp"].to_numpy()
+    R = results_df["R"].to_numpy(dtype=np.float64)
+    key = (smooth_mode, smooth_strength, smooth_window)
+    cache = st.session_state.get("_smooth_cache")
+    start = 0
+    if (
+        cache is not None
+        and cache["key"] == key
+        and 0 < cache["n"] <= n
+        and ts[cache["n"] - 1] == cache["ts_last"]
+        and R[cache["n"] - 1] == cache["R_last"]
+    ):
+        start = cache["n"]
+    if start == n:
+        return cache["cols"]
+
+    # (N, 3) block so each filter is one kernel call over all columns
+    X = results_df[list(SMOOTHED_COLUMNS)].to_numpy(dtype=np.float64)
+    new, ewm_state = smooth_series(
+        X, smooth_mode, smooth_strength, start, cache["ewm"] if start else None
+    )
+    R_smooth = rolling_mean(R, smooth_window, start)
+    if start:
+        new = np.concatenate([cache["smoothed"], new])
+        R_smooth = np.concatenate([cache["cols"]["R_smooth"], R_smooth])
+    cols = {c: new[:, j] for j, c in enumerate(SMOOTHED_COLUMNS)}
+    cols["R_smooth"] = R_smooth
+    st.session_state["_smooth_cache"] = {
+        "key": key,
+        "n": n,
+        "ts_last": ts[-1],
+        "R_last": R[-1],
+        "smoothed": new,
+        "cols": cols,
+        "ewm": ewm_state,
+    }
+    return cols
+
+
+def nearest_index(ts, target):
+    """Position of the sample closest to target in a non-decreasing ts array.
+
+    Binary search; ties go to the earlier sample, as with idxmin.
+    """
+    if len(ts) == 0:
+        raise ValueError("nearest_index of an empty array")
+    i = int(np.searchsorted(ts, target))
+    if i >= len(ts) or (i > 0 and abs(ts[i - 1] - target) <= abs(ts[i] - target)):
+        i -= 1
+    return int(np.searchsorted(ts, ts[i]))  # first of any repeated timestamps
+
+
+def _downsample(ts, y):
+    """(ts, y) reduced to about screen resolution with LTTB."""
+    if len(ts) <= LTTB_THRESHOLD:
+        return ts, y
+    idx = lttb_indices(ts, y, LTTB_POINTS)
+    return ts[idx], y[idx]
+
+
+def _new_metrics_figure():
+    """Empty metrics figure: R on y, θ_net on y2, predicted Δθ on y3."""
+    fig = go.Figure()
+    fig.add_scatter(mode="lines", name="R (raw)", line=dict(color="blue"), opacity=0.4)
+    fig.add_scatter(mode="lines", name="R (mean)", line=dict(color="blue", width=2.2))
+    fig.add_scatter(
+        mode="lines", name="θ_net [deg]", line=dict(color="orange"), yaxis="y2"
+    )
+    fig.add_scatter(
+        mode="lines",
+        name="Predicted Δθ [deg]",
+        line=dict(color="green", dash="dash"),
+        yaxis="y3",
+    )
+    fig.add_scatter(
+        mode="markers", name="Reset Opportunity", marker=dict(color="red", size=6)
+    )
+    fig.add_scatter(
+        mode="markers",
+        name="Replayed Event",
+        marker=dict(color="lime", size=12, line=dict(color="black", width=1)),
+    )
+    fig.update_layout(
+        xaxis=dict(title="Time [s]", domain=[0, 0.86]),
+        yaxis=dict(title=dict(text="R", font=dict(color="blue"))),
+        yaxis2=dict(
+            title=dict(text="θ_net [deg]", font=dict(color="orange")),
+            overlaying="y",
+            side="right",
+            anchor="x",
+            showgrid=False,
+        ),
+        yaxis3=dict(
+            title=dict(text="Predicted Δθ [deg]", font=dict(color="green")),
+            overlaying="y",
+            side="right",
+            anchor="free",
+            position=1.0,
+            showgrid=False,
+        ),
+        legend=dict(x=0.01, y=0.99, font=dict(size=10)),
+        margin=dict(l=0, r=0, t=10, b=0),
+        height=400,
+        uirevision="metrics",
+    )
+    return fig
+
+
 def plot_metrics(
     results_df,
     candidates_df,
@@ -199,100 +634,59 @@ def plot_metrics(
     smooth_strength=10,
     smooth_window=20,
 ):
-    """Plot R, θ_net, predicted benefit with smoothing & highlight."""
+    """Plot R, θ_net, predicted benefit with smoothing & highlight.
+
+    The Plotly figure lives in session_state and only its trace data is
+    replaced on each rerun; uirevision keeps the user's zoom.
+    """
     if results_df.empty:
         st.info("No data available to plot yet.")
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.text(0.5, 0.5, "Waiting for data...", ha="center", va="center")
-        st.pyplot(fig, clear_figure=True)
         return
 
-    df_plot = results_df.copy()
-    df_plot["R_smooth"] = (
-        df_plot["R"].rolling(window=smooth_window, min_periods=1).mean()
-    )
-    fig, ax1 = plt.subplots(figsize=(10, 4))
-
-    if smooth_mode != "None":
-        if smooth_mode == "Rolling Mean":
-            df_plot["R"] = df_plot["R"].rolling(smooth_strength, min_periods=1).mean()
-            df_plot["theta_net_deg"] = (
-                df_plot["theta_net_deg"].rolling(smooth_strength, min_periods=1).mean()
-            )
-            df_plot["predicted_benefit_deg"] = (
-                df_plot["predicted_benefit_deg"]
-                .rolling(smooth_strength, min_periods=1)
-                .mean()
-            )
-        elif smooth_mode == "Exponential Filter (EWMA)":
-            alpha = 2 / (smooth_strength + 1)
-            df_plot["R"] = df_plot["R"].ewm(alpha=alpha).mean()
-            df_plot["theta_net_deg"] = df_plot["theta_net_deg"].ewm(alpha=alpha).mean()
-            df_plot["predicted_benefit_deg"] = (
-                df_plot["predicted_benefit_deg"].ewm(alpha=alpha).mean()
-            )
-
-    ax1.plot(
-        df_plot["timestamp"], df_plot["R"], color="blue", alpha=0.4, label="R (raw)"
-    )
-    ax1.plot(
-        df_plot["timestamp"],
-        df_plot["R_smooth"],
-        color="blue",
-        linewidth=2.2,
-        label=f"R (mean {smooth_window})",
-    )
-    ax1.set_xlabel("Time [s]")
-    ax1.set_ylabel("R", color="blue")
-    ax2 = ax1.twinx()
-    ax2.plot(
-        df_plot["timestamp"],
-        df_plot["theta_net_deg"],
-        color="orange",
-        label="θ_net [deg]",
-    )
-    ax2.set_ylabel("θ_net [deg]", color="orange")
-    ax3 = ax1.twinx()
-    ax3.spines["right"].set_position(("outward", 60))
-    ax3.plot(
-        df_plot["timestamp"],
-        df_plot["predicted_benefit_deg"],
-        color="green",
-        linestyle="--",
-        label="Predicted Δθ [deg]",
-    )
-    ax3.set_ylabel("Predicted Δθ [deg]", color="green")
-    if not candidates_df.empty:
-        ax1.scatter(
-            candidates_df["timestamp"],
-            candidates_df["R"],
-            color="red",
-            s=20,
-            label="Reset Opportunity",
-        )
+    ts = results_df["timestamp"].to_numpy(dtype=np.float64)
+    sm = _smoothed_series(results_df, smooth_mode, smooth_strength, smooth_window)
+    fig = st.session_state.get("_metrics_fig")
+    if fig is None:
+        fig = st.session_state["_metrics_fig"] = _new_metrics_figure()
+
+    hx, hy, shapes = [], [], []
     if highlight_ts is not None:
         try:
-            nearest_idx = (df_plot["timestamp"] - highlight_ts).abs().idxmin()
-            ts_val = df_plot.loc[nearest_idx, "timestamp"]
-            R_val = df_plot.loc[nearest_idx, "R"]
-            ax1.scatter(
-                ts_val,
-                R_val,
-                color="lime",
-                s=80,
-                edgecolor="black",
-                zorder=5,
-                label="Replayed Event",
-            )
-            ax1.axvline(ts_val, color="lime", linestyle="--", alpha=0.6)
-        except (KeyError, ValueError):
+            nearest_idx = nearest_index(ts, highlight_ts)
+            hx, hy = [ts[nearest_idx]], [sm["R"][nearest_idx]]
+            shapes = [
+                dict(
+                    type="line",
+                    xref="x",
+                    yref="paper",
+                    x0=hx[0],
+                    x1=hx[0],
+                    y0=0,
+                    y1=1,
+                    line=dict(color="lime", dash="dash"),
+                    opacity=0.6,
+                )
+            ]
+        except ValueError:
             pass
-    lines, labels = [], []
-    for ax in [ax1, ax2, ax3]:
-        l, lab = ax.get_legend_handles_labels()
-        lines += l
-        labels += lab
-    if lines:
-        ax1.legend(lines, labels, loc="upper right", fontsize=8)
-    plt.tight_layout()
-    st.pyplot(fig, clear_figure=True)
+    if candidates_df.empty:
+        cx, cy = [], []
+    else:
+        cx = candidates_df["timestamp"].to_numpy()
+        cy = candidates_df["R"].to_numpy()
+
+    with fig.batch_update():
+        raw, mean, theta, benefit, cand, hl = fig.data
+        for trace, col in (
+            (raw, "R"),
+            (mean, "R_smooth"),
+            (theta, "theta_net_deg"),
+            (benefit, "predicted_benefit_deg"),
+        ):
+            xs, ys = _downsample(ts, sm[col])
+            trace.update(x=xs, y=ys)
+        mean.name = f"R (mean {smooth_window})"
+        cand.update(x=cx, y=cy)
+        hl.update(x=hx, y=hy)
+        fig.layout.shapes = shapes
+    st.plotly_chart(fig, key="metrics", width="stretch")
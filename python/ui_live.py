@@ -6,7 +6,7 @@
 # shared helpers for plotting and analysis.
 # ==========================================================
 
-import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
 import pandas as pd
@@ -15,17 +15,31 @@ import subprocess
 import sys
 
 # --- Import from shared modules ---
-from python.core_math import analyze_from_quats
 from python.events import EventLogger
+from python.smoothing_nb import SMOOTH_MODES
 from python.ui_helpers import (
     cached_3d_figure,
-    load_domain_telemetry,
+    cached_analyze,
+    incremental_analyze,
+    incremental_load,
+    inject_status_css,
+    nearest_index,
     plot_metrics,
+    prefix_mean_speed,
     render_status_bar,
+    summary_means,
+    telemetry_quats,
 )
 from live_data_logger import get_serial_ports
 from python.report_utils import export_pdf
 
+# Approximate plot width: redraws finer than one pixel of the full run are skipped
+PLOT_WIDTH_PX = 1000
+# Minimum quaternion change (|q - q_last|, sign-invariant) that redraws the cube
+CUBE_REDRAW_EPS = 1e-3
+# Serial port enumeration can take seconds on Windows; it runs here instead of the script thread
+_PORT_SCANNER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="port-scan")
+
 def on_domain_change():
     """Called when the user selects a new domain from the sidebar."""
     st.query_params["domain"] = st.session_state.selected_domain
@@ -39,6 +53,23 @@ def find_csv_files(directory="data"):
         return []
     return [str(f) for f in path.glob("*.csv")]
 
+def _wait_for_port_scan():
+    """Polled while a port scan runs; reruns the app once it has finished."""
+    if st.session_state._port_scan.done():
+        st.rerun()
+    st.caption("🔎 Scanning...")
+
+def _source_hz(full_df, path, default):
+    """Sample rate of the telemetry from its median Δt, memoized per (file, row count)."""
+    if "timestamp" not in full_df.columns or len(full_df) < 2:
+        return float(default)
+    key = (str(path), len(full_df))
+    cached = st.session_state.get('_src_hz')
+    if cached is None or cached[0] != key:
+        hz = 1.0 / max(np.median(np.diff(full_df["timestamp"].to_numpy())), 1e-6)
+        cached = st.session_state._src_hz = (key, hz)
+    return cached[1]
+
 # ==========================================================
 # Main Renderer
 # ==========================================================
@@ -116,8 +147,15 @@ def render_live_tab(st, DOMAIN_MAP, DOMAIN_COLORS):
         # --- Live Data Logger UI Section (Unchanged) ---
         st.markdown("---")
         st.markdown("### 🛰️ Live Data Logger")
-        if st.button("Scan for Serial Ports"):
-            with st.spinner("Scanning..."): ss.serial_ports = get_serial_ports()
+        if st.button("Scan for Serial Ports") and ss.get('_port_scan') is None:
+            ss._port_scan = _PORT_SCANNER.submit(get_serial_ports)
+        scan = ss.get('_port_scan')
+        if scan is not None and scan.done():
+            ss._port_scan = None
+            try: ss.serial_ports = scan.result()
+            except Exception as e: st.error(f"Port scan failed: {e}")
+        elif scan is not None:
+            st.fragment(run_every=0.3)(_wait_for_port_scan)()
         if ss.serial_ports:
             selected_port = st.selectbox("Select Port", ss.serial_ports)
             c1, c2 = st.columns(2)
@@ -125,11 +163,11 @@ def render_live_tab(st, DOMAIN_MAP, DOMAIN_COLORS):
                 if ss.logger_process is None:
                     cmd = [sys.executable, "live_data_logger.py", "--port", selected_port]
                     ss.logger_process = subprocess.Popen(cmd)
-                    st.success(f"Logging from {selected_port}"); st.rerun()
+                    st.success(f"Logging from {selected_port}")
             if c2.button("⏹️ Stop Logging"):
                 if ss.logger_process is not None:
                     ss.logger_process.terminate(); ss.logger_process = None
-                    st.info("Logger stopped."); st.rerun()
+                    st.info("Logger stopped.")
         if ss.logger_process: st.success(f"🟢 Logging active (PID: {ss.logger_process.pid})")
         else: st.info("⚪ Logger inactive.")
 
@@ -158,8 +196,8 @@ def render_live_tab(st, DOMAIN_MAP, DOMAIN_COLORS):
     # The 'path' variable now comes from session_state, set by the new file handler
     path_or_buffer = ss.csv_path
     
-    # The load_domain_telemetry function can accept a path OR an uploaded file object
-    full_df = load_domain_telemetry(domain_module, path_or_buffer)
+    # incremental_load accepts a path OR an uploaded file object; a growing CSV is only read past the last offset
+    full_df = incremental_load(domain_module, path_or_buffer)
     
     if full_df.empty:
         # Give a more specific message if waiting for an upload
@@ -170,16 +208,19 @@ def render_live_tab(st, DOMAIN_MAP, DOMAIN_COLORS):
         st.stop()
 
     # --- Button actions & State Update Logic ---
-    if start: ss.running = True; st.rerun()
-    if pause: ss.running = False; st.rerun()
+    # Nothing above depends on this state, so the rest of this run already
+    # renders it; no extra st.rerun() is needed.
+    if start: ss.running = True; ss.pop('pause_notice', None)
+    if pause: ss.running = False
     if reset:
         was_running = ss.running
         ss.running = False
-        current_view_df = full_df.iloc[:max(2, ss.sim_idx)].copy() if sim_mode else full_df.copy()
+        current_view_df = full_df.iloc[:max(2, ss.sim_idx)] if sim_mode else full_df
+        eff_window = int(max(10, round(window_seconds * _source_hz(full_df, path, fps_assumed)))) if adaptive_window else int(window)
 
         if was_running and auto_report and not current_view_df.empty:
             st.toast("⚙️ Generating final mission summary...")
-            final_results, final_candidates = analyze_from_quats(current_view_df, window=eff_window, fps=int(fps_assumed))
+            final_results, final_candidates = cached_analyze(current_view_df, eff_window, int(fps_assumed))
             
             if not final_results.empty:
                 report_path = Path("results/mission_summary.pdf")
@@ -194,31 +235,62 @@ def render_live_tab(st, DOMAIN_MAP, DOMAIN_COLORS):
 
         ss.sim_idx = 0
         ss.last_event_ts = -1e18
-        st.rerun()
+        ss.pop('pause_notice', None)
     
+    # --- Display Download Button ---
+    if 'last_report_path' in ss and ss.last_report_path:
+        with open(ss.last_report_path, "rb") as f:
+            st.sidebar.download_button("📥 Download Last Report", f, "mission_summary.pdf", "application/pdf")
+        del ss.last_report_path
+
+    # Status-bar styles go out once per full run, not with every fragment tick
+    inject_status_css(st)
+
+    # --- Live view: re-executed on its own at refresh_hz while running ---
+    run_every = max(0.02, 1.0 / refresh_hz) if ss.running else None
+    st.fragment(run_every=run_every)(_render_live_view)(domain_module, path_or_buffer, DOMAIN_COLORS)
+
+
+# ==========================================================
+# Live View (fragment)
+# ==========================================================
+def _render_live_view(domain_module, path_or_buffer, DOMAIN_COLORS):
+    """Playback, analysis and plots; runs as a fragment so ticks skip the sidebar."""
+    ss = st.session_state
+    path = ss.csv_path
+    window = ss.window
+    refresh_hz = ss.refresh_hz
+    fps_assumed = ss.fps_assumed
+    sim_mode = ss.sim_mode
+    speed = ss.get('speed', 1.0)
+    adaptive_window = ss.get('adaptive_window', False)
+    window_seconds = ss.get('window_seconds', 0.5)
+    was_running = ss.running
+    domain = ss.selected_domain
+
+    full_df = incremental_load(domain_module, path_or_buffer)
+    if full_df.empty:
+        st.warning("No data loaded yet or file is empty.")
+        return
+
     # --- Simulation Progression ---
-    view_df = full_df.copy() # Default to full data for Live Mode
+    # view_df is a read-only view of full_df (no copies per tick): nothing below may mutate it
+    view_df = full_df # Default to full data for Live Mode
     if sim_mode:
         if ss.running:
-            src_hz = 1.0 / max(np.median(np.diff(full_df["timestamp"].values)), 1e-6) if "timestamp" in full_df.columns and len(full_df) > 1 else float(fps_assumed)
+            src_hz = _source_hz(full_df, path, fps_assumed)
             frames_per_tick = max(1, int(round(speed * src_hz / refresh_hz)))
             ss.sim_idx += frames_per_tick
             if ss.sim_idx >= len(full_df):
                 ss.sim_idx = len(full_df)
                 ss.running = False
                 st.toast("✅ Simulation finished!")
-        view_df = full_df.iloc[:max(2, ss.sim_idx)].copy()
-
-    # --- Display Download Button ---
-    if 'last_report_path' in ss and ss.last_report_path:
-        with open(ss.last_report_path, "rb") as f:
-            st.sidebar.download_button("📥 Download Last Report", f, "mission_summary.pdf", "application/pdf")
-        del ss.last_report_path
+        view_df = full_df.iloc[:max(2, ss.sim_idx)]
 
     # --- Handle Replay Jump ---
     if "selected_event" in ss and ss.selected_event and "timestamp" in full_df.columns:
         # Find the index that corresponds to the event time
-        closest_idx = (full_df["timestamp"] - ss.selected_event['timestamp']).abs().idxmin()
+        closest_idx = nearest_index(full_df["timestamp"].to_numpy(), ss.selected_event['timestamp'])
         
         # --- THIS IS THE FIX for the "No Data" bug ---
         # Ensure the simulation index is at least one window size, so the plot has data.
@@ -229,72 +301,102 @@ def render_live_tab(st, DOMAIN_MAP, DOMAIN_COLORS):
         del ss.selected_event
 
     # --- Render Main UI ---
-    render_status_bar(st, ss.selected_domain, DOMAIN_COLORS, sim_mode, ss.running, ss.sim_idx, len(full_df))
+    render_status_bar(st, domain, DOMAIN_COLORS, sim_mode, ss.running, ss.sim_idx, len(full_df))
     st.markdown("### Plot Smoothing")
-    st.selectbox("Method", ["None", "Rolling Mean", "Exponential Filter (EWMA)"], key='smooth_mode')
+    st.selectbox("Method", SMOOTH_MODES, key='smooth_mode')
     st.slider("Strength", 1, 50, 10, key='smooth_strength')
 
     # --- Analysis ---
-    eff_window = int(max(10, round(window_seconds * (1.0 / max(np.median(np.diff(view_df["timestamp"].values)), 1e-6) if "timestamp" in view_df.columns and len(view_df) > 1 else float(fps_assumed))))) if adaptive_window else int(window)
-    results_df, candidates_df = analyze_from_quats(view_df, window=eff_window, fps=int(fps_assumed))
+    eff_window = int(max(10, round(window_seconds * _source_hz(full_df, path, fps_assumed)))) if adaptive_window else int(window)
+    quats = telemetry_quats(full_df)[:len(view_df)]
+    view_ts = view_df["timestamp"].to_numpy() if "timestamp" in view_df.columns else None
+    results_df, candidates_df, latest_candidate = incremental_analyze(quats, view_ts, eff_window, int(fps_assumed))
 
     # --- Decoupled Logging and Pausing Logic ---
-    if not candidates_df.empty and ss.running:
-        # Get the latest detected opportunity
-        latest_candidate = candidates_df.iloc[-1]
-        latest_ts = latest_candidate['timestamp']
+    # Locals for the per-tick checks; session state is written only when an event is handled
+    elog = ss.get('event_logger')
+    last_event_ts = ss.get('last_event_ts', -1e18)
+    if latest_candidate is not None and ss.running:
+        # The latest detected opportunity
+        latest_ts, latest_R, latest_theta, latest_benefit = latest_candidate
 
         # This check prevents handling the same event multiple times on fast reruns
-        if latest_ts > ss.get('last_event_ts', -1e18):
+        if latest_ts > last_event_ts:
             
             # --- Logging Logic (controlled by the new 'log_events' toggle) ---
             if ss.get('log_events', True):
-                if "event_logger" not in ss: ss.event_logger = EventLogger()
-                ss.event_logger.log(
+                if elog is None: elog = ss.event_logger = EventLogger()
+                elog.log(
                     ts=latest_ts,
-                    domain=ss.selected_domain,
-                    R=float(latest_candidate["R"]),
-                    theta_deg=float(latest_candidate["theta_net_deg"]),
-                    benefit_deg=float(latest_candidate["predicted_benefit_deg"])
+                    domain=domain,
+                    R=latest_R,
+                    theta_deg=latest_theta,
+                    benefit_deg=latest_benefit
                 )
                 st.toast(f"📄 Event logged at t={latest_ts:.2f}s")
 
             # --- Pausing Logic (controlled by the 'pause_on_reset' toggle) ---
             if ss.get('pause_on_reset', True):
                 ss.running = False
-                st.success(f"⏸ Paused at reset opportunity (t={latest_ts:.3f}s)")
+                # Make the event visible to the Analysis tab right away
+                if elog is not None: elog.flush()
+                ss.pause_notice = f"⏸ Paused at reset opportunity (t={latest_ts:.3f}s)"
             
             # Update the debounce tracker to prevent re-logging the same event
-            ss.last_event_ts = latest_ts
+            ss.last_event_ts = last_event_ts = latest_ts
+
+    if not ss.running and ss.get('pause_notice'): st.success(ss.pause_notice)
 
     # --- Layout & Display ---
     col_main, col_3d = st.columns([1.2, 1])
     with col_main:
-        highlight_ts = ss.last_event_ts if ss.last_event_ts > 0 else None
-        plot_metrics(results_df, candidates_df, highlight_ts, ss.smooth_mode, ss.smooth_strength, 20)
+        highlight_ts = last_event_ts if last_event_ts > 0 else None
+        # Redraw only when the plotted rows or settings changed; while playing,
+        # also wait until sim_idx has moved by a plot pixel (frame coalescing)
+        plot_key = (domain, str(path), eff_window, ss.smooth_mode, ss.smooth_strength, highlight_ts)
+        plot_rows = (len(results_df), results_df["timestamp"].iat[-1] if len(results_df) else None)
+        min_step = len(full_df) / PLOT_WIDTH_PX
+        redraw = (
+            '_metrics_fig' not in ss
+            or ss.get('_last_drawn_key') != plot_key
+            or (
+                ss.get('_last_drawn_rows') != plot_rows
+                and (not (sim_mode and ss.running) or abs(ss.sim_idx - ss.get('_last_drawn_idx', -1)) >= min_step)
+            )
+        )
+        if redraw:
+            plot_metrics(results_df, candidates_df, highlight_ts, ss.smooth_mode, ss.smooth_strength, 20)
+            ss._last_drawn_idx = ss.sim_idx
+            ss._last_drawn_key = plot_key
+            ss._last_drawn_rows = plot_rows
+        else:
+            st.plotly_chart(ss._metrics_fig, key="metrics", width='stretch')
         if highlight_ts: ss.last_event_ts = -1e18
         if sim_mode:
             pct = 100.0 * ss.sim_idx / max(1, len(full_df))
             st.progress(pct / 100.0, text=f"Timeline: {pct:.1f}% of run")
 
     with col_3d:
-        if not view_df.empty:
-            qw, qx, qy, qz = view_df[["qw", "qx", "qy", "qz"]].iloc[-1].tolist()
-            st.plotly_chart(cached_3d_figure(qw, qx, qy, qz), width='stretch')
-        else: st.plotly_chart(cached_3d_figure(1, 0, 0, 0), width='stretch')
+        q = quats[-1] if len(quats) else np.array([1.0, 0.0, 0.0, 0.0])
+        q = q / max(np.linalg.norm(q), 1e-15)
+        last_q = ss.get('_last_drawn_q')
+        if '_cube_fig' not in ss or last_q is None or np.sqrt(max(0.0, 2.0 - 2.0 * abs(np.dot(q, last_q)))) > CUBE_REDRAW_EPS:
+            ss._cube_fig = cached_3d_figure(*q)
+            ss._last_drawn_q = q
+        st.plotly_chart(ss._cube_fig, width='stretch')
 
     # --- Bottom Metrics ---
     m_r, m_th, m_ben, m_w = st.columns(4)
-    m_r.metric("Mean R", f"{results_df['R'].mean():.6f}" if not results_df.empty else "N/A")
-    m_th.metric("Mean θ_net [deg]", f"{results_df['theta_net_deg'].mean():.3f}" if not results_df.empty else "N/A")
-    m_ben.metric("Mean Δθ [deg]", f"{results_df['predicted_benefit_deg'].mean():.2f}" if not results_df.empty else "N/A")
+    mean_R, mean_th, mean_ben = summary_means(results_df)
+    m_r.metric("Mean R", f"{mean_R:.6f}" if not results_df.empty else "N/A")
+    m_th.metric("Mean θ_net [deg]", f"{mean_th:.3f}" if not results_df.empty else "N/A")
+    m_ben.metric("Mean Δθ [deg]", f"{mean_ben:.2f}" if not results_df.empty else "N/A")
     if all(c in view_df.columns for c in ["wx", "wy", "wz"]):
-        mean_w = np.nanmean(np.linalg.norm(view_df[["wx", "wy", "wz"]].to_numpy(), axis=1))
+        mean_w = prefix_mean_speed(full_df, len(view_df))
         m_w.metric("Mean |ω| [rad/s]", f"{mean_w:.3f}")
     if not candidates_df.empty: st.dataframe(candidates_df.tail(10), width='stretch', height=240)
     else: st.info("No reset opportunities detected yet.")
 
-    # --- Auto-refresh Trigger ---
-    if ss.running:
-        time.sleep(max(0.02, 1.0 / refresh_hz))
-        st.rerun()
\ No newline at end of file
+    # A tick that stopped playback reruns the whole app so the fragment timer is dropped
+    if was_running and not ss.running:
+        st.rerun()
@@ -4,13 +4,46 @@
 # Monte Carlo Resetability Simulation
 # ==========================================================
 
+import gzip
+import io
+import json
 from pathlib import Path
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 # --- Import from the final, robust report utility ---
-from python.report_utils import export_pdf
+from python.report_utils import export_pdf_bytes
+
+# (column, title, colour) of the three distribution panels
+HIST_PANELS = [
+    ("R", "R Distribution", "blue"),
+    ("theta_net_deg", "θ_net [deg]", "orange"),
+    ("predicted_benefit_deg", "Predicted Benefit [deg]", "green"),
+]
+HIST_BINS = 30
+
+def _csv_bytes(df):
+    """CSV bytes of a numeric frame, formatted by pyarrow's C++ writer when available."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        # Written straight into a bytes buffer: no intermediate str to encode
+        buf = io.BytesIO()
+        df.to_csv(buf, index=False, lineterminator="\n")
+        return buf.getvalue()
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), sink)
+    return sink.getvalue().to_pybytes()
+
+def _summary_json(summary):
+    """Indented JSON text of the summary dict, serialized by orjson when available."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(summary, indent=2)
+    return orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
 
 # ==========================================================
 # Main Renderer
@@ -27,12 +60,42 @@ def render_montecarlo_tab(st):
         st.error(f"Could not import Monte Carlo module → {e}")
         return
 
-    @st.cache_resource(show_spinner=True)
+    @st.cache_data(ttl=3600, max_entries=8, show_spinner=True)
     def cached_montecarlo(n_runs, n_steps, noise_sigma, seed):
         return run_montecarlo(
             n_runs, n_steps=n_steps, noise_sigma=noise_sigma, seed=seed
         )
 
+    @st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+    def cached_histograms(n_runs, n_steps, noise_sigma, seed):
+        """(counts, edges) per distribution panel, binned once per parameter set."""
+        df = cached_montecarlo(n_runs, n_steps, noise_sigma, seed)
+        hists = []
+        for col, _, _ in HIST_PANELS:
+            values = df[col].to_numpy()
+            hists.append(np.histogram(values[np.isfinite(values)], bins=HIST_BINS))
+        return hists
+
+    @st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+    def cached_results_csv_gz(n_runs, n_steps, noise_sigma, seed):
+        """Gzipped CSV bytes of a cached run, encoded once per parameter set.
+
+        Columns are exported as float32 (shortest round-trip digits, ~7
+        significant), which is about half the bytes of the float64 text.
+        Level 1 compression is fast and still shrinks the file ~2x; mtime=0
+        keeps the bytes identical for identical results.
+        """
+        df = cached_montecarlo(n_runs, n_steps, noise_sigma, seed)
+        csv_bytes = _csv_bytes(df.astype({c: np.float32 for c in df.select_dtypes("float64").columns}))
+        return gzip.compress(csv_bytes, compresslevel=1, mtime=0)
+
+    @st.cache_data(ttl=3600, max_entries=8, show_spinner=False)
+    def cached_report_pdf(n_runs, n_steps, noise_sigma, seed):
+        """PDF report bytes of a cached run; repeat clicks with the same parameters skip the rebuild."""
+        df = cached_montecarlo(n_runs, n_steps, noise_sigma, seed)
+        # For Monte Carlo data, the results and candidates are the same dataframe.
+        return export_pdf_bytes(df, df)
+
     with st.expander("⚙️ Simulation Settings", expanded=True):
         n_runs = st.slider("Number of runs", 50, 2000, 200, step=50, key="mc_runs")
         n_steps = st.slider("Steps per run", 20, 200, 80, step=10, key="mc_steps")
@@ -41,10 +104,14 @@ def render_montecarlo_tab(st):
         run_btn = st.button("▶ Run Simulation", width='stretch')
 
     if run_btn:
+        # The shown run stays up across later reruns (PDF and download clicks)
+        st.session_state["_mc_params"] = (n_runs, n_steps, noise_sigma, seed)
+    params = st.session_state.get("_mc_params")
+
+    if params is not None:
         with st.spinner("Running Monte Carlo simulations..."):
             try:
-                # Use the keys to get the values from session state
-                df = cached_montecarlo(st.session_state.mc_runs, st.session_state.mc_steps, st.session_state.mc_noise, st.session_state.mc_seed)
+                df = cached_montecarlo(*params)
                 summary = summarize_results(df)
             except Exception as e:
                 st.error(f"Simulation failed: {e}")
@@ -54,20 +121,30 @@ def render_montecarlo_tab(st):
 
         st.markdown("### 📊 Summary Statistics")
         c = st.columns(4)
-        c[0].metric("Runs", st.session_state.mc_runs)
-        c[1].metric("Steps per run", st.session_state.mc_steps)
-        c[2].metric("Mean R", f"{df['R'].mean():.4f}")
-        c[3].metric("Mean Δθ [deg]", f"{df['predicted_benefit_deg'].mean():.2f}")
+        c[0].metric("Runs", params[0])
+        c[1].metric("Steps per run", params[1])
+        c[2].metric("Mean R", f"{summary['mean_R']:.4f}")
+        c[3].metric("Mean Δθ [deg]", f"{summary['mean_benefit_deg']:.2f}")
 
         st.subheader("📄 Summary (JSON)")
-        st.json(summary)
+        # Plain highlighted text: no interactive tree widget to build and ship
+        st.code(_summary_json(summary), language="json")
 
         st.subheader("📈 Distributions")
-        fig, ax = plt.subplots(1, 3, figsize=(12, 3))
-        ax[0].hist(df["R"], bins=30, color="blue", alpha=0.7); ax[0].set_title("R Distribution")
-        ax[1].hist(df["theta_net_deg"], bins=30, color="orange", alpha=0.7); ax[1].set_title("θ_net [deg]")
-        ax[2].hist(df["predicted_benefit_deg"], bins=30, color="green", alpha=0.7); ax[2].set_title("Predicted Benefit [deg]")
-        plt.tight_layout(); st.pyplot(fig, clear_figure=True)
+        # One Figure per session, cleared and redrawn on later runs (no pyplot state)
+        if "_mc_hist_fig" not in st.session_state:
+            # matplotlib (~0.4 s to import) only loads once a simulation is shown
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(12, 3))
+            st.session_state["_mc_hist_fig"] = (fig, fig.subplots(1, 3))
+        fig, ax = st.session_state["_mc_hist_fig"]
+        for a in ax: a.cla()
+        hists = cached_histograms(*params)
+        # Pre-binned counts drawn as bars: one BarContainer per panel, no re-binning
+        for a, (counts, edges), (_, title, color) in zip(ax, hists, HIST_PANELS):
+            a.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color=color, alpha=0.7)
+            a.set_title(title)
+        fig.tight_layout(); st.pyplot(fig, clear_figure=False)
 
         # ==========================================================
         # Corrected Export Section
@@ -76,36 +153,38 @@ def render_montecarlo_tab(st):
         st.subheader("💾 Export Results")
 
         # --- CSV Export ---
-        csv_path = Path("results") / "montecarlo_results.csv"
+        # The same in-memory bytes are written to disk and offered for download
+        csv_gz = cached_results_csv_gz(*params)
+        csv_path = Path("results") / "montecarlo_results.csv.gz"
         csv_path.parent.mkdir(exist_ok=True)
-        df.to_csv(csv_path, index=False)
+        csv_path.write_bytes(csv_gz)
         st.info(f"💾 Raw results saved to `{csv_path}`")
-        with open(csv_path, "rb") as f:
-            st.download_button(
-                label="📥 Download Results CSV",
-                data=f.read(),
-                file_name="montecarlo_results.csv",
-                mime="text/csv",
-                width='stretch',
-            )
+        st.download_button(
+            label="📥 Download Results CSV (gzip)",
+            data=csv_gz,
+            file_name="montecarlo_results.csv.gz",
+            mime="application/gzip",
+            width='stretch',
+        )
 
         # --- PDF Report Export ---
+        # Built only on request; the bytes stay in session state for the download rerun
         st.markdown("---")
         report_path = Path("results/montecarlo_report.pdf")
-        
-        # The new export_pdf handles all summarizing and plotting internally.
-        # For Monte Carlo data, the results and candidates are the same dataframe 'df'.
-        export_pdf(df, df, str(report_path))
-        
-        st.info(f"📜 PDF report saved to `{report_path}`")
-        with open(report_path, "rb") as f:
+        if st.button("📜 Generate PDF", key="mc_gen_pdf", width='stretch'):
+            pdf_bytes = cached_report_pdf(*params)
+            report_path.write_bytes(pdf_bytes)
+            st.session_state["_mc_pdf"] = (params, pdf_bytes)
+        pdf_params, pdf_bytes = st.session_state.get("_mc_pdf", (None, None))
+        if pdf_params == params:
+            st.info(f"📜 PDF report saved to `{report_path}`")
             st.download_button(
                 label="📥 Download PDF Report",
-                data=f.read(),
+                data=pdf_bytes,
                 file_name="montecarlo_report.pdf",
                 mime="application/pdf",
                 width='stretch',
             )
-            
+
     else:
         st.info("Adjust parameters above, then click ▶ Run Simulation to begin.")
\ No newline at end of file
@@ -0,0 +1,64 @@
+# in tests/test_core_math.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from python.core_math import analyze_from_quats, analyze_quat_array, quat_error, quat_to_R
+from python.so3_reset import (estimate_lambda_and_R, predict_reset_benefit,
+                              quat_normalize, quat_to_axang)
+
+def test_analyze_matches_reference_implementation():
+    """The vectorized/JIT window analysis must agree with the so3_reset reference math."""
+    rng = np.random.default_rng(1)
+    q = rng.standard_normal((40, 4)) * 0.05 + np.array([1.0, 0.0, 0.0, 0.0])
+    df = pd.DataFrame(q, columns=["qw", "qx", "qy", "qz"])
+    window = 10
+
+    results_df, _ = analyze_from_quats(df, window=window, fps=10)
+
+    for k, i in enumerate(range(window, len(q) - 1)):
+        seq = [quat_to_axang(quat_error(q[j + 1], q[j])) for j in range(i - window, i)]
+        _, R, th_net = estimate_lambda_and_R(seq)
+        benefit_deg, *_ = predict_reset_benefit(seq, quat_normalize(q[i]))
+        assert np.isclose(results_df["R"].iloc[k], R, atol=1e-9)
+        assert np.isclose(results_df["theta_net_deg"].iloc[k], np.degrees(th_net), atol=1e-9)
+        assert np.isclose(results_df["predicted_benefit_deg"].iloc[k], benefit_deg, atol=1e-7)
+
+def test_nan_sample_gives_nan_rows_for_its_windows():
+    """A NaN quaternion must propagate to exactly the windows that include it."""
+    rng = np.random.default_rng(0)
+    q = rng.standard_normal((300, 4)) * 0.05 + np.array([1.0, 0.0, 0.0, 0.0])
+    q[150] = np.nan
+    df = pd.DataFrame(q, columns=["qw", "qx", "qy", "qz"])
+    window = 50
+
+    results_df, candidates_df = analyze_from_quats(df, window=window, fps=10)
+
+    # Window end i covers steps i-50..i-1 and uses sample i as q_current;
+    # steps 149 and 150 touch sample 150, so ends 150..200 are NaN.
+    ends = np.arange(window, len(q) - 1)
+    expected_nan = (ends >= 150) & (ends <= 200)
+    cols = results_df[["R", "theta_net_deg", "predicted_benefit_deg"]]
+    assert np.array_equal(cols.isna().all(axis=1).to_numpy(), expected_nan)
+    assert np.isfinite(cols.to_numpy()[~expected_nan]).all()
+    assert not candidates_df[["R", "theta_net_deg", "predicted_benefit_deg"]].isna().any().any()
+
+def test_analyze_from_two_threads_at_once():
+    """Concurrent Streamlit sessions analyze at the same time; both must get the serial result."""
+    rng = np.random.default_rng(3)
+    q = rng.standard_normal((5000, 4)) * 0.05 + np.array([1.0, 0.0, 0.0, 0.0])
+    expected, _ = analyze_quat_array(q, window=50, fps=10)
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futures = [ex.submit(analyze_quat_array, q, None, 50, 10) for _ in range(40)]
+        for f in futures:
+            results_df, _ = f.result(timeout=60)
+            pd.testing.assert_frame_equal(results_df, expected)
+
+def test_quat_to_R_is_scale_invariant():
+    """A tiny (unnormalized) quaternion must give the same rotation as its unit version."""
+    q = np.array([0.9, 0.3, -0.2, 0.25])
+    q /= np.linalg.norm(q)
+
+    assert np.allclose(quat_to_R(*(q * 1e-7)), quat_to_R(*q), atol=1e-6)
+
@@ -0,0 +1,50 @@
+# in tests/test_events.py
+import pandas as pd
+import pytest
+import python.events as events
+from python.events import EventLogger
+
+def test_logged_rows_reach_the_csv_after_close(tmp_path):
+    """Rows queued by log() must all be written, in order, once close() returns."""
+    path = tmp_path / "events.csv"
+    elog = EventLogger(path)
+    for i in range(100):
+        elog.log(ts=i * 0.1, domain="robotics", R=0.5, theta_deg=i, benefit_deg=-i)
+    elog.close()
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == ["wall_time", "timestamp", "domain", "R", "theta_net_deg", "predicted_benefit_deg"]
+    assert len(df) == 100
+    assert df["theta_net_deg"].tolist() == list(range(100))
+
+def test_writer_errors_are_raised_from_the_logger(tmp_path, monkeypatch):
+    """A write failure on the writer thread must surface from close() and later log() calls."""
+    path = tmp_path / "events.csv"
+    path.write_text("")
+    monkeypatch.setattr(events, "_open_log", lambda p: open(p, "r"))  # every write fails
+    elog = EventLogger(path)
+    elog.log(ts=0.0, domain="robotics", R=0.5, theta_deg=1.0, benefit_deg=-1.0)
+
+    with pytest.raises(OSError):
+        elog.close()
+    with pytest.raises(OSError):
+        elog.log(ts=0.1, domain="robotics", R=0.5, theta_deg=1.0, benefit_deg=-1.0)
+
+def test_unopenable_log_is_raised_from_the_logger(tmp_path):
+    """Failing to create the log on the writer thread must surface too."""
+    blocker = tmp_path / "results"
+    blocker.write_text("")  # a file where the results/ directory should go
+    elog = EventLogger(blocker / "events.csv")
+
+    with pytest.raises(OSError):
+        elog.close()
+
+def test_analysis_tab_skips_a_half_written_last_row(tmp_path):
+    """A reader racing the writer must drop the partial last line, not fail on it."""
+    from python.ui_analysis import _load_events
+    path = tmp_path / "events.csv"
+    path.write_text("timestamp,domain,R\n1.0,robotics,0.5\n2.0,robotics,0.4\n3.0,robo")
+
+    df = _load_events(str(path), 0.0, 0)
+
+    assert list(df["timestamp"]) == [2.0, 1.0]
@@ -0,0 +1,18 @@
+# in tests/test_lttb.py
+import numpy as np
+from python.lttb import lttb_indices
+
+def test_lttb_keeps_endpoints_and_peaks():
+    """LTTB must return sorted unique indices, keep both ends and pick up an isolated spike."""
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0
+    y[100:200] = np.nan
+
+    idx = lttb_indices(x, y, 500)
+
+    assert len(idx) == 500
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+    assert np.array_equal(lttb_indices(x[:300], y[:300], 500), np.arange(300))
@@ -0,0 +1,31 @@
+# in tests/test_smoothing_nb.py
+import numpy as np
+import pandas as pd
+from python.smoothing_nb import (ewma, ewma_extend, ewma_extend_2d, ewma_state,
+                                 rolling_mean, rolling_mean_2d)
+
+def test_kernels_match_pandas_and_extend_incrementally():
+    """Numba smoothing must reproduce pandas rolling/ewm, NaNs included, also when resumed mid-series."""
+    rng = np.random.default_rng(2)
+    x = rng.random(300)
+    x[[0, 1, 40, 41, 42, 200]] = np.nan
+    s = pd.Series(x)
+
+    np.testing.assert_allclose(rolling_mean(x, 20), s.rolling(20, min_periods=1).mean(), atol=1e-12)
+    np.testing.assert_allclose(rolling_mean(x, 20, 150), s.rolling(20, min_periods=1).mean()[150:], atol=1e-12)
+    np.testing.assert_allclose(ewma(x, 0.2), s.ewm(alpha=0.2).mean(), atol=1e-12)
+
+    head, num, den, y = ewma_extend(x[:150], 0.2, 0.0, 0.0, np.nan)
+    tail = ewma_extend(x[150:], 0.2, num, den, y)[0]
+    np.testing.assert_allclose(np.concatenate([head, tail]), s.ewm(alpha=0.2).mean(), atol=1e-12)
+
+def test_2d_kernels_match_per_column():
+    """The column-parallel kernels must equal the 1-D kernels applied column by column."""
+    rng = np.random.default_rng(3)
+    X = rng.random((200, 3))
+    X[10, 1] = np.nan
+
+    np.testing.assert_allclose(rolling_mean_2d(X, 7, 50), np.stack([rolling_mean(X[:, j], 7, 50) for j in range(3)], axis=1))
+    out, state = ewma_extend_2d(X, 0.3, ewma_state(3))
+    np.testing.assert_allclose(out, np.stack([ewma(X[:, j], 0.3) for j in range(3)], axis=1))
+    assert state.shape == (3, 3)
@@ -1,6 +1,10 @@
 # in tests/test_so3_reset.py
 import numpy as np
-from python.so3_reset import quat_mul
+import pytest
+from python.so3_reset import (RotSeq, SO3ResetStream, axang_to_quat,
+                              estimate_lambda_and_R, predict_reset_benefit,
+                              predict_reset_benefit_batch, quat_mul,
+                              quat_mul_vec)
 
 def test_quat_identity_multiplication():
     """Test that multiplying by the identity quaternion [1,0,0,0] doesn't change anything."""
@@ -9,4 +13,73 @@ def test_quat_identity_multiplication():
     
     result = quat_mul(q, identity)
     
-    assert np.allclose(q, result)
\ No newline at end of file
+    assert np.allclose(q, result)
+
+@pytest.mark.parametrize("dtype", [np.int64, np.float32])
+def test_quat_mul_keeps_input_dtype(dtype):
+    """Non-float64 input comes back in its own dtype, not upcast to float64."""
+    q = np.array([1, 2, 3, 4], dtype=dtype)
+    identity = np.array([1, 0, 0, 0], dtype=dtype)
+
+    result = quat_mul(q, identity)
+
+    assert result.dtype == dtype
+    assert np.array_equal(result, q)
+
+def test_quat_mul_accepts_component_major_batch():
+    """(4, N) input multiplies column by column, like quat_mul_vec on (N, 4)."""
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((5, 4))
+    b = rng.standard_normal((5, 4))
+
+    result = quat_mul(a.T, b.T)
+
+    assert result.shape == (4, 5)
+    assert np.allclose(result.T, quat_mul_vec(a, b))
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_batched_identity_multiplication(dtype):
+    """quat_mul_vec with identity on either side must return the batch unchanged."""
+    rng = np.random.default_rng(0)
+    qs = rng.standard_normal((1024, 4)).astype(dtype)
+    qs /= np.linalg.norm(qs, axis=1, keepdims=True)
+    identity = np.broadcast_to(np.array([1, 0, 0, 0], dtype=dtype), qs.shape)
+
+    assert np.allclose(quat_mul_vec(qs, identity), qs)
+    assert np.allclose(quat_mul_vec(identity, qs), qs)
+
+def test_batched_benefit_matches_scalar():
+    """predict_reset_benefit_batch must reproduce the per-sequence scalar results."""
+    rng = np.random.default_rng(0)
+    axes = rng.standard_normal((8, 30, 3))
+    thetas = np.abs(rng.normal(0.02, 0.01, (8, 30)))
+    q_current = axang_to_quat([0, 0, 1], 0.05)
+
+    batch = predict_reset_benefit_batch(axes, thetas, q_current)
+
+    for r in range(len(axes)):
+        expected = predict_reset_benefit(list(zip(axes[r], thetas[r])), q_current)
+        assert np.allclose([col[r] for col in batch], expected, atol=1e-8)
+
+def test_stream_keeps_last_n_increments_in_order():
+    """The ring buffer must evaluate exactly the last N pushes, oldest first."""
+    rng = np.random.default_rng(1)
+    stream = SO3ResetStream(window_sec=0.1, dt=0.005)  # N = 20
+    pushed = []
+    for _ in range(47):
+        n, th = rng.standard_normal(3), rng.uniform(0.01, 0.1)
+        stream.push_axis_angle_increment(n, th)
+        pushed.append((n / np.linalg.norm(n), th))
+
+    assert len(stream.buf) == stream.N
+    assert np.allclose(stream.lambda_R_theta(), estimate_lambda_and_R(pushed[-stream.N:]))
+
+def test_rotseq_matches_list_of_pairs():
+    """RotSeq (SoA arrays) and the legacy list-of-tuples input must agree."""
+    rng = np.random.default_rng(2)
+    pairs = [(rng.standard_normal(3), rng.uniform(0.01, 0.1)) for _ in range(25)]
+    rs = RotSeq.from_pairs(pairs)
+    q_current = axang_to_quat([0, 0, 1], 0.05)
+
+    assert len(rs) == 25
+    assert np.allclose(predict_reset_benefit(rs, q_current), predict_reset_benefit(pairs, q_current))
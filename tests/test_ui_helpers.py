@@ -0,0 +1,28 @@
+# in tests/test_ui_helpers.py
+import numpy as np
+import pandas as pd
+import python.ui_helpers as ui_helpers
+from python.domains import robot
+from python.ui_helpers import incremental_load
+
+def _write_rows(path, start, stop, mode="a"):
+    rows = pd.DataFrame({"timestamp": np.arange(start, stop) * 0.1, "qw": 1.0, "qx": 0.0, "qy": 0.0, "qz": 0.0})
+    rows.to_csv(path, mode=mode, header=(mode == "w"), index=False)
+
+def test_rows_appended_before_the_full_parse_are_not_read_twice(tmp_path, monkeypatch):
+    """Rows appended between the size stat and the parse must be counted in the tail offset."""
+    path = tmp_path / "telemetry.csv"
+    _write_rows(path, 0, 20, mode="w")
+    ui_helpers.st.session_state.pop("_csv_cache", None)
+
+    load = ui_helpers.load_domain_telemetry
+    def load_after_append(domain_module, p):
+        _write_rows(path, 20, 25)  # the logger writes while the file is being loaded
+        return load(domain_module, p)
+    monkeypatch.setattr(ui_helpers, "load_domain_telemetry", load_after_append)
+    assert len(incremental_load(robot, str(path))) == 25
+
+    monkeypatch.setattr(ui_helpers, "load_domain_telemetry", load)
+    _write_rows(path, 25, 30)
+    df = incremental_load(robot, str(path))
+    assert np.allclose(df["timestamp"], np.arange(30) * 0.1)